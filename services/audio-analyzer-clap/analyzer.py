@@ -23,15 +23,22 @@ import os
 import sys
 import signal
 import json
+import random
+import subprocess
 import time
 import gc
+import itertools
+import queue
+import contextlib
 import threading
 import uuid
-from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
 import traceback
 import numpy as np
 import librosa
+import soundfile as sf
+import soxr
 import requests
 
 _CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -47,12 +54,20 @@ for _root in _POTENTIAL_PROJECT_ROOTS:
         break
 
 from services.common.logging_utils import configure_service_logger
-from services.common.analyzer_env import configure_thread_env, get_int_env
+from services.common.analyzer_env import configure_thread_env, get_bool_env, get_int_env
 
 # CPU thread limiting must be set before importing torch
 THREADS_PER_WORKER = get_int_env('THREADS_PER_WORKER', 1)
 configure_thread_env(THREADS_PER_WORKER)
 
+# CUDA allocator config is read when torch initializes CUDA. Expandable
+# segments plus power-of-two rounding limit fragmentation from variable-length
+# audio batches and repeated model unload/reload cycles.
+os.environ.setdefault(
+    'PYTORCH_CUDA_ALLOC_CONF',
+    'expandable_segments:True,roundup_power2_divisions:8',
+)
+
 import torch
 torch.set_num_threads(THREADS_PER_WORKER)
 
@@ -66,7 +81,7 @@ else:
 
 import redis
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from pgvector.psycopg2 import register_vector
 
 logger = configure_service_logger('clap-analyzer')
@@ -79,6 +94,35 @@ SLEEP_INTERVAL = get_int_env('SLEEP_INTERVAL', 5)
 NUM_WORKERS = get_int_env('NUM_WORKERS', 2)
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://backend:3006')
 MODEL_IDLE_TIMEOUT = get_int_env('MODEL_IDLE_TIMEOUT', 300)
+# GPU models are parked in pinned host memory when idle, and only fully
+# unloaded after this many idle timeouts
+PARKED_UNLOAD_FACTOR = 10
+# Max tracks drained from the queue and embedded in one model call
+BATCH_SIZE = max(1, get_int_env('BATCH_SIZE', 8))
+# How long the batcher waits for other workers' clips to fill a model call
+BATCH_TIMEOUT_MS = max(0, get_int_env('BATCH_TIMEOUT_MS', 20))
+# Compile the HTSAT audio encoder with torch.compile on load (opt-in: the
+# first load pays a compile cost and CPU Inductor needs a C++ toolchain)
+COMPILE_MODEL = get_bool_env('COMPILE_MODEL', False)
+# Run GPU inference under bf16/fp16 autocast (tensor cores, half the bandwidth)
+MIXED_PRECISION = get_bool_env('MIXED_PRECISION', True)
+# Dynamic int8 quantization of Linear layers for CPU inference (opt-in: the
+# embeddings shift slightly relative to ones produced by the FP32 model)
+QUANTIZE_CPU_MODEL = get_bool_env('QUANTIZE_CPU_MODEL', False)
+# Store GPU weights in bf16/fp16 (halves VRAM and the host-to-device copy on
+# every reload; implies autocast; opt-in for the same reason as above)
+HALF_PRECISION_WEIGHTS = get_bool_env('HALF_PRECISION_WEIGHTS', False)
+# Replay the audio encoder from a captured CUDA graph (GPU only, opt-in)
+CUDA_GRAPHS = get_bool_env('CUDA_GRAPHS', False)
+
+# Which model branches this process serves: audio (embedding jobs), text
+# (interactive text queries) or both. Unused branches are dropped on load.
+CLAP_ROLE = os.getenv('CLAP_ROLE', 'both').strip().lower()
+if CLAP_ROLE not in ('audio', 'text', 'both'):
+    logger.warning(f"Unknown CLAP_ROLE '{CLAP_ROLE}', using 'both'")
+    CLAP_ROLE = 'both'
+SERVES_AUDIO = CLAP_ROLE in ('audio', 'both')
+SERVES_TEXT = CLAP_ROLE in ('text', 'both')
 
 # Queue and channel names
 ANALYSIS_QUEUE = 'audio:clap:queue'
@@ -90,13 +134,23 @@ TEXT_EMBED_CLAIM_IDLE_MS = get_int_env('TEXT_EMBED_CLAIM_IDLE_MS', 60000)
 TEXT_EMBED_CLAIM_BATCH = get_int_env('TEXT_EMBED_CLAIM_BATCH', 10)
 CONTROL_CHANNEL = 'audio:clap:control'
 
+# Checkpoint baked into the image at build time
+CLAP_CHECKPOINT_PATH = '/app/models/music_audioset_epoch_15_esc_90.14.pt'
+
 # Model version identifier
 MODEL_VERSION = 'laion-clap-music-v1'
+# Row template for embedding upserts; the constant version is inlined so it
+# isn't bound as a parameter for every row
+EMBEDDING_ROW_TEMPLATE = f"(%s, %s, '{MODEL_VERSION}', NOW())"
 
 # Audio processing: extract middle segment for consistent, efficient embedding
 # 60 seconds captures the "vibe" without intros/outros and reduces memory usage
 MAX_AUDIO_DURATION = 60  # seconds
 CLAP_SAMPLE_RATE = 48000  # 48kHz for CLAP model
+# HTSAT consumes fixed 10 s windows; CLAP crops/pads every clip to this length
+CLAP_INPUT_SAMPLES = 480000
+# Compressed formats decoded by an ffmpeg pipe instead of librosa/audioread
+FFMPEG_DECODE_EXTENSIONS = {'.mp3', '.m4a', '.aac', '.mp4'}
 
 
 class CLAPAnalyzer:
@@ -111,13 +165,52 @@ class CLAPAnalyzer:
     def __init__(self):
         """Initialize analyzer state and lazy model-loading controls."""
         self.model = None
+        # _lock guards load/unload; each branch has its own inference lock so
+        # interactive text queries don't queue behind audio batches.
         self._lock = threading.Lock()
+        self._audio_lock = threading.Lock()
+        self._text_lock = threading.Lock()
+        self._text_stream = torch.cuda.Stream() if DEVICE.type == 'cuda' else None
         self.last_work_time: float = time.time()
         self._model_loaded = False
+        # GPU weights parked in pinned host memory (VRAM freed, model warm)
+        self._parked = False
+        # Wakes the idle monitor on load/unload and worker activity
+        self._state_cv = threading.Condition()
+        # Incremented each time workers find the queue newly drained; the idle
+        # monitor only checks for remaining work once per drain
+        self.queue_drains = 0
+        self._queue_empty = False
+        # Incremented per finished worker batch; invalidates the idle
+        # monitor's cached remaining-track count
+        self.batches_done = 0
+        self._autocast_dtype: Optional[torch.dtype] = None
+        self._audio_graph = None
+        self._graph_input: Optional[torch.Tensor] = None
+        self._graph_output: Optional[torch.Tensor] = None
+        # Reusable page-locked staging buffer for host-to-device batch copies
+        self._pinned_batch: Optional[torch.Tensor] = None
+        self._pinned_copy_done: Optional[torch.cuda.Event] = None
+        # Audio inference requests from all workers are coalesced into shared
+        # model calls by a single batcher thread
+        self._audio_requests: "queue.Queue[Tuple[List[np.ndarray], Future]]" = queue.Queue()
+        self._audio_batcher = threading.Thread(
+            target=self._run_audio_batches,
+            name="AudioBatcher",
+            daemon=True,
+        )
+        self._audio_batcher.start()
+        # Decoding is I/O and C-extension bound, so threads overlap well here
+        self._load_executor = ThreadPoolExecutor(
+            max_workers=BATCH_SIZE,
+            thread_name_prefix="AudioLoader",
+        )
 
     def load_model(self):
         """Load the CLAP model (thread-safe, idempotent)"""
-        with self._lock:
+        # Hold both inference locks too: nothing may launch kernels while the
+        # model is half-initialized or a CUDA graph is being captured.
+        with self._lock, self._audio_lock, self._text_lock:
             if self.model is not None:
                 return
 
@@ -129,10 +222,26 @@ class CLAPAnalyzer:
                     enable_fusion=False,
                     amodel='HTSAT-base'
                 )
-                self.model.load_ckpt('/app/models/music_audioset_epoch_15_esc_90.14.pt')
+                self._load_checkpoint()
+                self._drop_unused_branch()
 
-                # Move to detected device (GPU if available, else CPU)
+                # Cast/quantize on the host first so the device copy moves
+                # the smaller weights, then move to detected device
+                self._configure_precision()
                 self.model = self.model.to(DEVICE).eval()
+
+                if SERVES_AUDIO and DEVICE.type == 'cuda':
+                    self._pinned_batch = torch.empty(
+                        (BATCH_SIZE, CLAP_INPUT_SAMPLES), dtype=torch.float32, pin_memory=True
+                    )
+                    self._pinned_copy_done = torch.cuda.Event()
+
+                if SERVES_AUDIO and COMPILE_MODEL:
+                    # reduce-overhead mode already records CUDA graphs
+                    self._compile_audio_branch()
+                elif SERVES_AUDIO and CUDA_GRAPHS and DEVICE.type == 'cuda':
+                    self._capture_audio_graph()
+
                 self._model_loaded = True
                 self.last_work_time = time.time()
 
@@ -140,35 +249,379 @@ class CLAPAnalyzer:
                     logger.info(f"CLAP model loaded successfully on GPU: {GPU_NAME}")
                 else:
                     logger.info("CLAP model loaded successfully on CPU")
+                self.notify_state_change()
             except Exception as e:
                 logger.error(f"Failed to load CLAP model: {e}")
                 traceback.print_exc()
                 raise
 
+    def _load_checkpoint(self):
+        """
+        Load CLAP weights from a memory-mapped checkpoint.
+
+        torch.load(mmap=True) maps the file instead of reading it into fresh
+        heap buffers, and assign=True makes the mapped tensors the parameters,
+        so a reload after an idle unload is served from the page cache.
+        Falls back to laion_clap's own loader on older torch or legacy
+        (non-zip) checkpoints.
+        """
+        try:
+            checkpoint = torch.load(
+                CLAP_CHECKPOINT_PATH,
+                map_location='cpu',
+                mmap=True,
+                weights_only=False,
+            )
+        except (TypeError, RuntimeError) as e:
+            logger.debug(f"Memory-mapped checkpoint load unavailable ({e}), using load_ckpt")
+            self.model.load_ckpt(CLAP_CHECKPOINT_PATH)
+            return
+
+        state_dict = checkpoint.get('state_dict', checkpoint) if isinstance(checkpoint, dict) else checkpoint
+        # Checkpoints saved from DistributedDataParallel prefix keys with "module."
+        state_dict = {
+            (key[len('module.'):] if key.startswith('module.') else key): value
+            for key, value in state_dict.items()
+        }
+
+        # position_ids is a buffer whose persistence varies across transformers
+        # versions; everything else must match
+        missing, _unexpected = self.model.model.load_state_dict(state_dict, strict=False, assign=True)
+        missing = [key for key in missing if not key.endswith('position_ids')]
+        if missing:
+            raise RuntimeError(f"CLAP checkpoint is missing weights: {missing[:5]}")
+
+    def _drop_unused_branch(self):
+        """Delete the encoder branch this role never calls before moving to device."""
+        if CLAP_ROLE == 'both':
+            return
+
+        clap = self.model.model
+        prefix = 'text' if CLAP_ROLE == 'audio' else 'audio'
+        for name in (f'{prefix}_branch', f'{prefix}_transform', f'{prefix}_projection'):
+            if hasattr(clap, name):
+                delattr(clap, name)
+
+        gc.collect()
+        self._trim_process_memory()
+        logger.info(f"CLAP role '{CLAP_ROLE}': {prefix} branch dropped")
+
+    @staticmethod
+    def _trim_process_memory():
+        """
+        Force glibc to return freed pages to OS (Python/PyTorch hold RSS otherwise).
+
+        The image preloads jemalloc, which decays dirty pages on its own; this
+        is the fallback for glibc-only runs (local/dev) and a no-op otherwise.
+        """
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except Exception:
+            pass
+
+    def _configure_precision(self):
+        """Select GPU autocast/weight dtype or quantize Linear layers for CPU inference."""
+        self._autocast_dtype = None
+        if DEVICE.type == 'cuda':
+            if MIXED_PRECISION or HALF_PRECISION_WEIGHTS:
+                self._autocast_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                logger.info(f"CLAP inference autocast enabled ({self._autocast_dtype})")
+            if HALF_PRECISION_WEIGHTS:
+                # Autocast still feeds float32 inputs (waveforms) correctly
+                self.model = self.model.to(dtype=self._autocast_dtype)
+                logger.info(f"CLAP weights stored in {self._autocast_dtype}")
+        elif QUANTIZE_CPU_MODEL:
+            self.model.model = torch.ao.quantization.quantize_dynamic(
+                self.model.model,
+                {torch.nn.Linear},
+                dtype=torch.qint8,
+            )
+            logger.info("CLAP Linear layers quantized to int8 for CPU inference")
+
+    def _inference_context(self, graph_capture: bool = False) -> contextlib.ExitStack:
+        """Inference-mode context with autocast applied when enabled."""
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self._autocast_dtype is not None:
+            # Autocast's weight-cast cache must be disabled while capturing graphs
+            stack.enter_context(torch.autocast(
+                device_type=DEVICE.type,
+                dtype=self._autocast_dtype,
+                cache_enabled=not graph_capture,
+            ))
+        return stack
+
+    @staticmethod
+    def _to_float32_numpy(embeddings: torch.Tensor) -> np.ndarray:
+        """
+        Move (possibly half-precision) model output to host as float32.
+
+        The whole (batch, 512) block is copied in one DMA, still in its device
+        dtype, into pinned memory; widening to float32 happens on the host.
+        """
+        embeddings = embeddings.detach()
+        if embeddings.device.type == 'cuda':
+            host = torch.empty(embeddings.shape, dtype=embeddings.dtype, pin_memory=True)
+            host.copy_(embeddings, non_blocking=True)
+            torch.cuda.current_stream().synchronize()
+            embeddings = host
+        if embeddings.dtype != torch.float32:
+            embeddings = embeddings.float()
+        return embeddings.numpy()
+
+    def _compile_audio_branch(self):
+        """
+        Compile the audio encoder and trigger compilation with a warmup pass.
+
+        Called with the model lock held. Inductor's on-disk FX graph cache makes
+        recompiles after an idle unload/reload much cheaper than the first one.
+        Falls back to eager mode if compilation fails.
+        """
+        mode = 'reduce-overhead' if DEVICE.type == 'cuda' else 'default'
+        eager_branch = self.model.model.audio_branch
+        try:
+            self.model.model.audio_branch = torch.compile(eager_branch, mode=mode, fullgraph=False)
+            warmup_audio = np.zeros(CLAP_SAMPLE_RATE * MAX_AUDIO_DURATION, dtype=np.float32)
+            start = time.time()
+            with self._inference_context():
+                self.model.get_audio_embedding_from_data([torch.from_numpy(warmup_audio)], use_tensor=True)
+            logger.info(f"CLAP audio encoder compiled (mode={mode}) in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager audio encoder: {e}")
+            self.model.model.audio_branch = eager_branch
+
+    def _encode_waveforms(self, waveforms: torch.Tensor) -> torch.Tensor:
+        """Audio encoder + projection over a (batch, CLAP_INPUT_SAMPLES) device tensor."""
+        clap = self.model.model
+        embeds = clap.encode_audio({'waveform': waveforms}, device=DEVICE)['embedding']
+        return torch.nn.functional.normalize(clap.audio_projection(embeds), dim=-1)
+
+    def _graph_forward(self) -> torch.Tensor:
+        """Audio encoder forward over the static graph input buffer."""
+        return self._encode_waveforms(self._graph_input)
+
+    def _capture_audio_graph(self):
+        """
+        Capture the audio encoder for a fixed (BATCH_SIZE, CLAP_INPUT_SAMPLES) input.
+
+        Called with the model lock held. Smaller batches are zero-padded to the
+        captured shape on replay. Falls back to eager inference on failure.
+        """
+        try:
+            start = time.time()
+            with self._inference_context(graph_capture=True):
+                self._graph_input = torch.zeros((BATCH_SIZE, CLAP_INPUT_SAMPLES), device=DEVICE)
+
+                # Warm up on a side stream so lazy init happens outside capture
+                side_stream = torch.cuda.Stream()
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    for _ in range(3):
+                        self._graph_forward()
+                torch.cuda.current_stream().wait_stream(side_stream)
+
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph):
+                    self._graph_output = self._graph_forward()
+
+            self._audio_graph = graph
+            logger.info(f"CLAP audio encoder captured as CUDA graph (batch={BATCH_SIZE}) in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"CUDA graph capture failed, using eager audio encoder: {e}")
+            self._release_audio_graph()
+
+    def _release_audio_graph(self):
+        """Drop the captured graph and its static buffers."""
+        self._audio_graph = None
+        self._graph_input = None
+        self._graph_output = None
+
+    def _prepare_waveforms(self, audios: List[np.ndarray]) -> torch.Tensor:
+        """
+        Build the encoder input batch on the model device.
+
+        Mirrors CLAP's rand_trunc/repeatpad data path, but crops on the host
+        before any copy (only 10 s of each 60 s clip is transferred) and runs
+        the int16 quantization round trip on the device in one batched op.
+        HTSAT computes the STFT and log-mel filterbank itself on the device.
+        On GPU, clips are written straight into a pinned staging buffer so the
+        upload is a true async DMA.
+
+        Returns:
+            Tensor of shape (len(audios), CLAP_INPUT_SAMPLES) on DEVICE
+        """
+        pinned = self._pinned_batch is not None and len(audios) <= len(self._pinned_batch)
+        if pinned:
+            # The previous upload from the buffer must land before reuse
+            self._pinned_copy_done.synchronize()
+            staging = self._pinned_batch[:len(audios)]
+            batch = staging.numpy()
+            batch.fill(0.0)
+        else:
+            batch = np.zeros((len(audios), CLAP_INPUT_SAMPLES), dtype=np.float32)
+            staging = torch.from_numpy(batch)
+
+        for row, audio in zip(batch, audios):
+            overflow = len(audio) - CLAP_INPUT_SAMPLES
+            if overflow > 0:
+                start = np.random.randint(0, overflow + 1)
+                row[:] = audio[start:start + CLAP_INPUT_SAMPLES]
+            elif len(audio):
+                # Repeat the clip as many whole times as fit; zero-pad the rest
+                repeats = CLAP_INPUT_SAMPLES // len(audio)
+                row[:repeats * len(audio)] = np.tile(audio, repeats)
+
+        waveforms = staging.to(DEVICE, non_blocking=True)
+        if pinned:
+            self._pinned_copy_done.record()
+        # Same quantization as CLAP's float32_to_int16/int16_to_float32
+        return (waveforms.clamp_(-1.0, 1.0) * 32767.0).to(torch.int16).float() / 32767.0
+
+    def _embed_audio(self, audios: List[np.ndarray]) -> torch.Tensor:
+        """
+        Run the audio encoder over decoded clips; call with the lock held.
+
+        Uses the captured CUDA graph when available, otherwise runs the
+        encoder eagerly on the device-prepared batch.
+
+        Returns:
+            Tensor of shape (len(audios), 512) on the model device
+        """
+        if self._audio_graph is None:
+            return self._encode_waveforms(self._prepare_waveforms(audios))
+
+        outputs = []
+        for start in range(0, len(audios), BATCH_SIZE):
+            chunk = self._prepare_waveforms(audios[start:start + BATCH_SIZE])
+            count = chunk.shape[0]
+            self._graph_input[count:].zero_()
+            self._graph_input[:count].copy_(chunk, non_blocking=True)
+            self._audio_graph.replay()
+            outputs.append(self._graph_output[:count].clone())
+        return torch.cat(outputs)
+
     def unload_model(self):
         """Unload the CLAP model to free memory"""
-        with self._lock:
+        with self._lock, self._audio_lock, self._text_lock:
             if self.model is None:
                 return
             logger.info("Unloading CLAP model to free memory...")
+            self._release_audio_graph()
+            self._pinned_batch = None
+            self._pinned_copy_done = None
             self.model = None
             self._model_loaded = False
+            self._parked = False
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
             gc.collect()
-            # Force glibc to return freed pages to OS (Python/PyTorch hold RSS otherwise)
-            try:
-                import ctypes
-                ctypes.CDLL("libc.so.6").malloc_trim(0)
-            except Exception:
-                pass
+            self._trim_process_memory()
             logger.info("CLAP model unloaded")
+            self.notify_state_change()
+
+    def notify_state_change(self):
+        """Wake the idle monitor to re-evaluate model residency."""
+        with self._state_cv:
+            self._state_cv.notify_all()
+
+    def note_queue_state(self, empty: bool):
+        """Record whether a worker's blocking read found the queue empty."""
+        with self._state_cv:
+            if empty and not self._queue_empty:
+                self.queue_drains += 1
+                self._state_cv.notify_all()
+            self._queue_empty = empty
+
+    def note_batch_done(self):
+        """Record a finished worker batch and wake the idle monitor."""
+        with self._state_cv:
+            self.batches_done += 1
+            self._state_cv.notify_all()
+
+    def _model_tensors(self):
+        """All parameters and buffers of the loaded model."""
+        clap = self.model.model
+        return itertools.chain(clap.parameters(), clap.buffers())
+
+    def park_to_cpu(self) -> bool:
+        """
+        Move GPU weights into pinned host memory, releasing VRAM.
+
+        Keeps the model objects alive so waking is a single async DMA of
+        already-pinned tensors rather than a disk load. The captured CUDA
+        graph points at device buffers, so it is dropped and recaptured on wake.
+
+        Returns:
+            True if the model is parked, False if there is nothing to park
+            (CPU deployment or model not loaded)
+        """
+        if DEVICE.type != 'cuda':
+            return False
+
+        with self._lock, self._audio_lock, self._text_lock:
+            if self.model is None:
+                return False
+            if self._parked:
+                return True
+
+            self._release_audio_graph()
+            for tensor in self._model_tensors():
+                host = torch.empty_like(tensor.data, device='cpu', pin_memory=True)
+                host.copy_(tensor.data)
+                tensor.data = host
+            self._parked = True
+            torch.cuda.empty_cache()
+            logger.info("CLAP model parked in pinned host memory (VRAM released)")
+
+        self.notify_state_change()
+        return True
+
+    def _wake_to_gpu(self):
+        """Copy parked weights back to the GPU."""
+        with self._lock, self._audio_lock, self._text_lock:
+            if not self._parked or self.model is None:
+                return
+
+            start = time.time()
+            for tensor in self._model_tensors():
+                tensor.data = tensor.data.to(DEVICE, non_blocking=True)
+            torch.cuda.current_stream().synchronize()
+            self._parked = False
+
+            if SERVES_AUDIO and CUDA_GRAPHS and not COMPILE_MODEL:
+                self._capture_audio_graph()
+            logger.info(f"CLAP model restored to GPU in {time.time() - start:.2f}s")
+
+        self.notify_state_change()
 
     def ensure_model(self):
-        """Ensure model is loaded, reloading if it was unloaded for idle"""
+        """Ensure model is loaded, reloading if it was unloaded or parked for idle"""
         if self.model is None:
             logger.info("Reloading CLAP model (new work arrived)...")
             self.load_model()
+        elif self._parked:
+            self._wake_to_gpu()
+
+    @contextlib.contextmanager
+    def _model_ready(self, inference_lock: threading.Lock):
+        """
+        Hold an inference lock with the model loaded and on its device.
+
+        park_to_cpu and unload_model take the same lock, so the check made
+        under it can't go stale before inference. Waking takes every lock,
+        so it runs with the inference lock released and the check repeats.
+        """
+        while True:
+            self.ensure_model()
+            inference_lock.acquire()
+            if self.model is not None and not self._parked:
+                break
+            inference_lock.release()
+        try:
+            yield
+        finally:
+            inference_lock.release()
 
     def _load_audio_chunk(self, audio_path: str, duration_hint: Optional[float] = None) -> Tuple[Optional[np.ndarray], int]:
         """
@@ -179,35 +632,166 @@ class CLAPAnalyzer:
 
         Args:
             audio_path: Path to the audio file
-            duration_hint: Pre-computed duration in seconds (avoids file read)
+            duration_hint: Pre-computed duration in seconds (used by the librosa
+                fallback to avoid a file probe)
 
         Returns:
             Tuple of (audio_array, sample_rate) or (None, 0) on error
         """
         try:
-            # Use provided duration or fall back to computing it
-            duration = duration_hint if duration_hint else librosa.get_duration(path=audio_path)
+            if os.path.splitext(audio_path)[1].lower() in FFMPEG_DECODE_EXTENSIONS:
+                try:
+                    return self._decode_audio_chunk_ffmpeg(audio_path, duration_hint), CLAP_SAMPLE_RATE
+                except RuntimeError as e:
+                    logger.debug(f"ffmpeg could not decode {audio_path} ({e}), falling back")
 
-            if duration > MAX_AUDIO_DURATION:
+            try:
+                audio, sr = self._read_audio_chunk_native(audio_path)
+            except RuntimeError as e:
+                # soundfile raises LibsndfileError (a RuntimeError) for formats
+                # libsndfile can't decode (mp3 on older builds, m4a/aac);
+                # fall back to librosa's audioread path for those.
+                logger.debug(f"soundfile could not read {audio_path} ({e}), falling back to librosa")
+                audio, sr = self._load_audio_chunk_librosa(audio_path, duration_hint)
+
+            # Normalize once (no copy when the decoder already produced
+            # contiguous float32) so soxr resamples in float32 and the batch
+            # path can wrap the array with torch.from_numpy as-is.
+            audio = np.ascontiguousarray(audio, dtype=np.float32)
+
+            # Both paths decode at the native rate; libsoxr handles the one
+            # resample, and 48 kHz sources skip it entirely.
+            if sr != CLAP_SAMPLE_RATE:
+                audio = soxr.resample(audio, sr, CLAP_SAMPLE_RATE, quality='HQ')
+
+            return audio, CLAP_SAMPLE_RATE
+
+        except FileNotFoundError:
+            logger.error(f"Audio file not found: {audio_path}")
+            return None, 0
+        except Exception as e:
+            logger.error(f"Failed to load audio from {audio_path}: {e}")
+            traceback.print_exc()
+            return None, 0
+
+    @staticmethod
+    def _read_audio_chunk_native(audio_path: str) -> Tuple[np.ndarray, int]:
+        """
+        Read the middle MAX_AUDIO_DURATION seconds at the file's native rate.
+
+        Uses libsndfile directly: duration comes from the frame count in the
+        header, and only the requested frames are decoded after a seek.
+
+        Returns:
+            Tuple of (mono float32 audio, native sample rate)
+        """
+        with sf.SoundFile(audio_path) as f:
+            sr = f.samplerate
+            chunk_frames = int(MAX_AUDIO_DURATION * sr)
+
+            if f.frames > chunk_frames:
                 # Extract middle segment
-                offset = (duration - MAX_AUDIO_DURATION) / 2
-                audio, sr = librosa.load(
-                    audio_path,
-                    sr=CLAP_SAMPLE_RATE,
-                    offset=offset,
-                    duration=MAX_AUDIO_DURATION,
-                    mono=True
-                )
+                f.seek((f.frames - chunk_frames) // 2)
+                audio = f.read(frames=chunk_frames, dtype='float32', always_2d=False)
             else:
                 # Short track, load entirely
-                audio, sr = librosa.load(audio_path, sr=CLAP_SAMPLE_RATE, mono=True)
+                audio = f.read(dtype='float32', always_2d=False)
 
-            return audio, sr
+        if audio.ndim == 2:
+            audio = audio.mean(axis=1)
 
-        except Exception as e:
-            logger.error(f"Failed to load audio from {audio_path}: {e}")
-            traceback.print_exc()
-            return None, 0
+        return audio, sr
+
+    @staticmethod
+    def _probe_duration_ffmpeg(audio_path: str) -> float:
+        """Read the container duration with ffprobe (no decoding)."""
+        result = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1',
+                audio_path,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            raise RuntimeError(f"ffprobe returned no duration (exit {result.returncode})")
+
+    @staticmethod
+    def _decode_audio_chunk_ffmpeg(audio_path: str, duration_hint: Optional[float] = None) -> np.ndarray:
+        """
+        Decode the middle MAX_AUDIO_DURATION seconds with an ffmpeg pipe.
+
+        ffmpeg seeks in the container (-ss before -i), downmixes and resamples
+        to 48 kHz itself, and streams raw float32 straight into a preallocated
+        array, skipping audioread's per-block Python loop for mp3/AAC.
+
+        Returns:
+            Mono float32 audio at CLAP_SAMPLE_RATE
+        """
+        try:
+            duration = duration_hint or CLAPAnalyzer._probe_duration_ffmpeg(audio_path)
+            offset = max(0.0, (duration - MAX_AUDIO_DURATION) / 2)
+
+            audio = np.empty(MAX_AUDIO_DURATION * CLAP_SAMPLE_RATE, dtype=np.float32)
+            view = memoryview(audio).cast('B')
+            filled = 0
+
+            with subprocess.Popen(
+                [
+                    'ffmpeg', '-v', 'quiet', '-nostdin',
+                    '-ss', f'{offset:.3f}',
+                    '-t', str(MAX_AUDIO_DURATION),
+                    '-i', audio_path,
+                    '-ac', '1',
+                    '-ar', str(CLAP_SAMPLE_RATE),
+                    '-f', 'f32le', '-',
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            ) as proc:
+                while filled < len(view):
+                    n = proc.stdout.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+
+                if filled == len(view):
+                    # Buffer is full; don't wait on trailing rounding samples
+                    proc.kill()
+                elif proc.wait() != 0:
+                    raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+        except (OSError, subprocess.SubprocessError) as e:
+            # Missing ffmpeg/ffprobe binaries or a hung probe
+            raise RuntimeError(str(e)) from e
+
+        samples = filled // audio.itemsize
+        if samples == 0:
+            raise RuntimeError("ffmpeg produced no audio")
+
+        return audio[:samples]
+
+    @staticmethod
+    def _load_audio_chunk_librosa(audio_path: str, duration_hint: Optional[float] = None) -> Tuple[np.ndarray, int]:
+        """Load the middle audio segment at native rate via librosa for formats libsndfile can't read."""
+        # Use provided duration or fall back to computing it (None and 0 both probe)
+        duration = duration_hint or librosa.get_duration(path=audio_path)
+
+        if duration > MAX_AUDIO_DURATION:
+            offset = (duration - MAX_AUDIO_DURATION) / 2
+            return librosa.load(
+                audio_path,
+                sr=None,
+                offset=offset,
+                duration=MAX_AUDIO_DURATION,
+                mono=True
+            )
+
+        return librosa.load(audio_path, sr=None, mono=True)
 
     def get_audio_embedding(self, audio_path: str, duration: Optional[float] = None) -> Optional[np.ndarray]:
         """
@@ -223,42 +807,125 @@ class CLAPAnalyzer:
         Returns:
             numpy array of shape (512,) or None on error
         """
+        return self.get_audio_embeddings([(audio_path, duration)])[0]
+
+    def _load_audio_item(self, item: Tuple[str, Optional[float]]) -> Optional[np.ndarray]:
+        """Decode one (audio_path, duration_hint) item on the loader pool."""
+        audio_path, duration = item
+        # Load audio (with chunking), use provided duration to skip file probe
+        audio, sr = self._load_audio_chunk(audio_path, duration)
+        if audio is not None:
+            logger.debug(f"Loaded audio: {len(audio)/sr:.1f}s at {sr}Hz")
+        return audio
+
+    def submit_audio_loads(self, items: List[Tuple[str, Optional[float]]]) -> List[Future]:
+        """
+        Start decoding audio items in the background.
+
+        Lets a caller overlap decoding of the next batch with inference of the
+        current one; pass the futures to get_audio_embeddings.
+
+        Returns:
+            Futures aligned with items, each resolving to audio or None
+        """
+        return [self._load_executor.submit(self._load_audio_item, item) for item in items]
+
+    def get_audio_embeddings(
+        self,
+        items: List[Tuple[str, Optional[float]]],
+        pending_loads: Optional[List[Future]] = None,
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Generate embeddings for several audio files with a single model call.
+
+        Audio chunks are decoded concurrently on the loader thread pool, then
+        every successfully loaded clip goes to the audio batcher, which may
+        merge them with other workers' clips into the same encoder call.
+
+        Args:
+            items: List of (audio_path, duration_hint) tuples
+            pending_loads: Futures from submit_audio_loads(items), if decoding
+                was already started
+
+        Returns:
+            List aligned with items: numpy array of shape (512,) or None on error
+        """
         self.ensure_model()
         self.last_work_time = time.time()
 
-        if not os.path.exists(audio_path):
-            logger.error(f"Audio file not found: {audio_path}")
-            return None
+        results: List[Optional[np.ndarray]] = [None] * len(items)
+        if not items:
+            return results
+
+        if pending_loads is None:
+            pending_loads = self.submit_audio_loads(items)
+        loaded = [future.result() for future in pending_loads]
+        batch_indices = [i for i, audio in enumerate(loaded) if audio is not None]
+        if not batch_indices:
+            return results
 
         try:
-            # Load audio (with chunking), use provided duration to skip file probe
-            audio, sr = self._load_audio_chunk(audio_path, duration)
+            request: Future = Future()
+            self._audio_requests.put(([loaded[i] for i in batch_indices], request))
+            embeddings = request.result()
 
-            if audio is None:
-                return None
+            # Result is shape (batch, 512) for HTSAT-base model, normalized
+            if embeddings.shape[1] != 512:
+                logger.warning(f"Unexpected embedding dimension: {embeddings.shape}")
+            for row, i in enumerate(batch_indices):
+                results[i] = embeddings[row]
 
-            logger.debug(f"Loaded audio: {len(audio)/sr:.1f}s at {sr}Hz")
+        except Exception as e:
+            paths = ", ".join(items[i][0] for i in batch_indices)
+            logger.error(f"Failed to generate audio embeddings for {paths}: {e}")
+            traceback.print_exc()
 
-            with self._lock:
-                # Use get_audio_embedding_from_data for pre-loaded audio
-                # This gives us control over memory usage
-                embeddings = self.model.get_audio_embedding_from_data(
-                    [audio],
-                    use_tensor=False
-                )
+        return results
 
-                # Result is shape (1, 512) for HTSAT-base model, normalized
-                embedding = embeddings[0]
+    def _run_audio_batches(self):
+        """
+        Coalesce decoded clips from all workers into shared model calls.
 
-                if embedding.shape[0] != 512:
-                    logger.warning(f"Unexpected embedding dimension: {embedding.shape}")
+        Takes the first pending request, then waits up to BATCH_TIMEOUT_MS for
+        others while they still fit in BATCH_SIZE clips, runs one forward pass
+        and hands each request its slice of the embeddings. A request that
+        would overflow the batch starts the next one instead.
+        """
+        carried = None
+        while True:
+            requests = [carried if carried is not None else self._audio_requests.get()]
+            carried = None
+            clip_count = len(requests[0][0])
+            deadline = time.monotonic() + BATCH_TIMEOUT_MS / 1000
+            while clip_count < BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._audio_requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if clip_count + len(request[0]) > BATCH_SIZE:
+                    carried = request
+                    break
+                requests.append(request)
+                clip_count += len(request[0])
 
-                return embedding.astype(np.float32)
+            try:
+                # The idle monitor may have parked the model since callers checked
+                with self._model_ready(self._audio_lock), self._inference_context():
+                    embeddings = self._to_float32_numpy(
+                        self._embed_audio([audio for audios, _ in requests for audio in audios])
+                    )
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
 
-        except Exception as e:
-            logger.error(f"Failed to generate audio embedding for {audio_path}: {e}")
-            traceback.print_exc()
-            return None
+            offset = 0
+            for audios, future in requests:
+                future.set_result(embeddings[offset:offset + len(audios)])
+                offset += len(audios)
 
     def get_text_embedding(self, text: str) -> Optional[np.ndarray]:
         """
@@ -278,19 +945,27 @@ class CLAPAnalyzer:
             return None
 
         try:
-            with self._lock:
+            stream_context = (
+                torch.cuda.stream(self._text_stream)
+                if self._text_stream is not None
+                else contextlib.nullcontext()
+            )
+            # Text runs on its own CUDA stream so it can overlap audio kernels
+            with self._model_ready(self._text_lock), stream_context, self._inference_context():
                 # CLAP expects a list of text prompts
-                embeddings = self.model.get_text_embedding(
-                    [text],
-                    use_tensor=False
+                embeddings = self._to_float32_numpy(
+                    self.model.get_text_embedding(
+                        [text],
+                        use_tensor=True
+                    )
                 )
 
-                embedding = embeddings[0]
+            embedding = embeddings[0]
 
-                if embedding.shape[0] != 512:
-                    logger.warning(f"Unexpected text embedding dimension: {embedding.shape}")
+            if embedding.shape[0] != 512:
+                logger.warning(f"Unexpected text embedding dimension: {embedding.shape}")
 
-                return embedding.astype(np.float32)
+            return embedding
 
         except Exception as e:
             logger.error(f"Failed to generate text embedding: {e}")
@@ -301,10 +976,14 @@ class CLAPAnalyzer:
 class DatabaseConnection:
     """PostgreSQL connection manager with pgvector support and auto-reconnect"""
 
+    # Probe with SELECT 1 only after the connection has sat idle this long
+    HEALTH_CHECK_INTERVAL = 60  # seconds
+
     def __init__(self, url: str):
         """Store connection URL and initialize disconnected state."""
         self.url = url
         self.conn = None
+        self._last_used = 0.0
 
     def connect(self):
         """Establish database connection with pgvector extension"""
@@ -320,6 +999,7 @@ class DatabaseConnection:
 
         # Register pgvector type
         register_vector(self.conn)
+        self._last_used = time.monotonic()
 
         logger.info("Connected to PostgreSQL with pgvector support")
 
@@ -342,9 +1022,19 @@ class DatabaseConnection:
         self.connect()
 
     def get_cursor(self) -> RealDictCursor:
-        """Get a database cursor, reconnecting if necessary"""
-        if not self.is_connected():
+        """
+        Get a database cursor, reconnecting if necessary.
+
+        psycopg2 marks the connection closed once a statement hits a dead
+        socket, so checking that is free; the SELECT 1 round trip only runs
+        when the connection has been idle past HEALTH_CHECK_INTERVAL.
+        """
+        now = time.monotonic()
+        if self.conn is None or self.conn.closed:
             self.reconnect()
+        elif now - self._last_used >= self.HEALTH_CHECK_INTERVAL and not self.is_connected():
+            self.reconnect()
+        self._last_used = now
         return self.conn.cursor(cursor_factory=RealDictCursor)
 
     def commit(self):
@@ -372,30 +1062,40 @@ class Worker:
     and stores results in PostgreSQL.
     """
 
-    def __init__(self, worker_id: int, analyzer: CLAPAnalyzer, stop_event: threading.Event):
+    HEARTBEAT_INTERVAL_SECONDS = 30  # Backend treats a heartbeat as live for 5 minutes
+
+    def __init__(
+        self,
+        worker_id: int,
+        analyzer: CLAPAnalyzer,
+        stop_event: threading.Event,
+        redis_pool: Optional[redis.ConnectionPool] = None,
+    ):
         """Initialize worker identity, shared analyzer, and shutdown signal."""
         self.worker_id = worker_id
         self.analyzer = analyzer
         self.stop_event = stop_event
+        self.redis_pool = redis_pool
         self.redis_client = None
         self.db = None
+        self._next_heartbeat_at = 0.0
+        # Next batch (jobs, decode futures), read while the current batch is
+        # on the model so decoding overlaps inference
+        self._prefetched: Optional[Tuple[List[Tuple[str, str, Optional[float]]], List[Future]]] = None
 
     def start(self):
         """Start the worker loop"""
         logger.info(f"Worker {self.worker_id} starting...")
 
         try:
-            self.redis_client = redis.from_url(REDIS_URL)
+            if self.redis_pool is not None:
+                self.redis_client = redis.Redis(connection_pool=self.redis_pool)
+            else:
+                self.redis_client = redis.from_url(REDIS_URL, decode_responses=True)
             self.db = DatabaseConnection(DATABASE_URL)
             self.db.connect()
 
             while not self.stop_event.is_set():
-                # Publish heartbeat for feature detection
-                try:
-                    self.redis_client.set("clap:worker:heartbeat", str(int(time.time() * 1000)))
-                except Exception:
-                    pass  # Heartbeat is informational, don't crash on Redis failure
-
                 try:
                     self._process_job()
                 except psycopg2.Error as e:
@@ -408,66 +1108,197 @@ class Worker:
                     traceback.print_exc()
                     time.sleep(SLEEP_INTERVAL)
 
+            if self._prefetched is not None:
+                # Popped list jobs are not redelivered, so finish what was read
+                try:
+                    self._process_job()
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id} failed to finish prefetched batch: {e}")
+
         finally:
             if self.db:
                 self.db.close()
             logger.info(f"Worker {self.worker_id} stopped")
 
     def _process_job(self):
-        """Process a single job from the queue"""
-        # Try to get a job from the queue (blocking with timeout)
-        job_data = self.redis_client.blpop(ANALYSIS_QUEUE, timeout=SLEEP_INTERVAL)
-
-        if not job_data:
-            return
+        """Process a batch of jobs from the queue"""
+        if self._prefetched is not None:
+            jobs, pending_loads = self._prefetched
+            self._prefetched = None
+        else:
+            raw_jobs = self._read_jobs(block=True)
+            self.analyzer.note_queue_state(not raw_jobs)
+            if not raw_jobs:
+                return
+            jobs = self._parse_jobs(raw_jobs)
+            pending_loads = self.analyzer.submit_audio_loads(
+                [(full_path, duration) for _, full_path, duration in jobs]
+            )
 
-        _, raw_job = job_data
-        job = json.loads(raw_job)
+        if jobs:
+            self.analyzer.notify_state_change()
+            self._prefetch_next()
 
-        track_id = job.get('trackId')
-        file_path = job.get('filePath', '')
-        duration = job.get('duration')  # Pre-computed duration in seconds
+        try:
+            self._process_batch(jobs, pending_loads)
+        finally:
+            if jobs:
+                self.analyzer.note_batch_done()
 
-        if not track_id:
-            logger.warning(f"Invalid job (no trackId): {job}")
-            return
+    def _prefetch_next(self):
+        """
+        Read the next batch without blocking and start decoding its audio.
 
-        logger.info(f"Worker {self.worker_id} processing track: {track_id}")
+        Runs before the current batch is processed, so it never raises: an
+        error here must not cost the batch that was already popped.
+        """
+        try:
+            raw_jobs = self._read_jobs(block=False)
+            if raw_jobs:
+                jobs = self._parse_jobs(raw_jobs)
+                pending_loads = self.analyzer.submit_audio_loads(
+                    [(full_path, duration) for _, full_path, duration in jobs]
+                )
+                self._prefetched = (jobs, pending_loads)
+        except Exception as e:
+            # The blocking read on the next iteration surfaces real problems
+            logger.warning(f"Worker {self.worker_id} could not prefetch next batch: {e}")
 
-        # Update track status to processing
-        self._update_track_status(track_id, 'processing')
+    def _read_jobs(self, block: bool) -> List[str]:
+        """
+        Read up to BATCH_SIZE raw job payloads from the queue.
 
-        # Build full path (normalize Windows-style paths)
-        normalized_path = file_path.replace('\\', '/')
-        full_path = os.path.join(MUSIC_PATH, normalized_path)
+        Blocks briefly for the first job if block is set, then drains
+        whatever else is already queued so a single model call can embed
+        the whole batch.
+        """
+        # Publish heartbeat for feature detection at most every
+        # HEARTBEAT_INTERVAL_SECONDS, riding on whichever read runs first
+        heartbeat_due = time.monotonic() >= self._next_heartbeat_at
+        heartbeat = str(int(time.time() * 1000))
+
+        raw_jobs = []
+        if block:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            if heartbeat_due:
+                pipeline.set("clap:worker:heartbeat", heartbeat)
+            pipeline.blpop(ANALYSIS_QUEUE, timeout=SLEEP_INTERVAL)
+            # Heartbeat is informational; only a failed read should propagate
+            job_data = pipeline.execute(raise_on_error=False)[-1]
+            if isinstance(job_data, Exception):
+                raise job_data
+            if heartbeat_due:
+                heartbeat_due = False
+                self._next_heartbeat_at = time.monotonic() + self.HEARTBEAT_INTERVAL_SECONDS
+            if not job_data:
+                return []
+            raw_jobs.append(job_data[1])
+
+        remaining = BATCH_SIZE - len(raw_jobs)
+        if remaining > 0:
+            # Drain the rest in one atomic LRANGE+LTRIM round-trip
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.lrange(ANALYSIS_QUEUE, 0, remaining - 1)
+            pipe.ltrim(ANALYSIS_QUEUE, remaining, -1)
+            if heartbeat_due:
+                # Busy workers live on prefetch reads and rarely block
+                pipe.set("clap:worker:heartbeat", heartbeat)
+            drained = pipe.execute()[0]
+            if heartbeat_due:
+                self._next_heartbeat_at = time.monotonic() + self.HEARTBEAT_INTERVAL_SECONDS
+            raw_jobs.extend(drained)
+
+        return raw_jobs
 
-        # Generate embedding (pass duration to avoid file probe)
-        embedding = self.analyzer.get_audio_embedding(full_path, duration)
+    @staticmethod
+    def _parse_jobs(raw_jobs: List[str]) -> List[Tuple[str, str, Optional[float]]]:
+        """
+        Turn raw queue payloads into (track_id, full_path, duration) tuples.
 
-        if embedding is None:
-            self._mark_failed(track_id, "Failed to generate embedding")
+        Each payload is decoded on its own: entries that are not a JSON
+        object, or have no track id or file path, are logged and skipped
+        so the rest of the drained batch is kept.
+        """
+        jobs = []
+        for raw_job in raw_jobs:
+            try:
+                job = json.loads(raw_job)
+            except ValueError as e:
+                logger.warning(f"Skipping undecodable job {raw_job!r}: {e}")
+                continue
+            if not isinstance(job, dict):
+                logger.warning(f"Skipping non-object job: {raw_job!r}")
+                continue
+
+            track_id = job.get('trackId')
+
+            if not track_id:
+                logger.warning(f"Invalid job (no trackId): {job}")
+                continue
+
+            file_path = job.get('filePath', '')
+            if not isinstance(file_path, str):
+                logger.warning(f"Invalid job (bad filePath): {job}")
+                continue
+            duration = job.get('duration')  # Pre-computed duration in seconds
+
+            # Build full path (normalize Windows-style paths)
+            normalized_path = file_path.replace('\\', '/')
+            full_path = os.path.join(MUSIC_PATH, normalized_path)
+            jobs.append((track_id, full_path, duration))
+
+        return jobs
+
+    def _process_batch(
+        self,
+        jobs: List[Tuple[str, str, Optional[float]]],
+        pending_loads: List[Future],
+    ):
+        """Embed and persist a batch of parsed jobs."""
+        if not jobs:
             return
 
-        # Store embedding in database
-        success = self._store_embedding(track_id, embedding)
+        logger.info(f"Worker {self.worker_id} processing {len(jobs)} track(s): {', '.join(j[0] for j in jobs)}")
+
+        # Mark the tracks processing in its own commit, before inference: it
+        # has to be visible while the batch runs so the backend doesn't
+        # re-queue 'pending' tracks and stale cleanup times from this start
+        self._update_track_status([track_id for track_id, _, _ in jobs], 'processing')
+
+        # Generate embeddings from the already-started decodes
+        embeddings = self.analyzer.get_audio_embeddings(
+            [(full_path, duration) for _, full_path, duration in jobs],
+            pending_loads,
+        )
 
-        if success:
-            self._update_track_status(track_id, 'completed')
-            logger.info(f"Worker {self.worker_id} completed track: {track_id}")
+        stored = []
+        failures = []
+        for (track_id, _, _), embedding in zip(jobs, embeddings):
+            if embedding is None:
+                failures.append((track_id, "Failed to generate embedding"))
+            else:
+                stored.append((track_id, embedding))
+
+        # Store embeddings, completion status and failures in one transaction
+        if self._finalize_batch(stored, failures):
+            for track_id, _ in stored:
+                logger.info(f"Worker {self.worker_id} completed track: {track_id}")
         else:
-            self._mark_failed(track_id, "Failed to store embedding")
+            self._mark_failed(
+                failures + [(track_id, "Failed to store embedding") for track_id, _ in stored]
+            )
 
-    def _update_track_status(self, track_id: str, status: str):
-        """Update the track's vibe analysis status (CLAP embeddings)"""
+    def _update_track_status(self, track_ids: List[str], status: str):
+        """Update the tracks' vibe analysis status (CLAP embeddings)"""
         cursor = self.db.get_cursor()
         try:
             cursor.execute("""
                 UPDATE "Track"
                 SET
                     "vibeAnalysisStatus" = %s,
-                    "vibeAnalysisStatusUpdatedAt" = %s
-                WHERE id = %s
-            """, (status, datetime.utcnow(), track_id))
+                    "vibeAnalysisStatusUpdatedAt" = NOW()
+                WHERE id = ANY(%s)
+            """, (status, track_ids))
             self.db.commit()
         except Exception as e:
             logger.error(f"Failed to update track vibe status: {e}")
@@ -475,38 +1306,119 @@ class Worker:
         finally:
             cursor.close()
 
-    def _mark_failed(self, track_id: str, error: str):
-        """Mark track as failed and record in enrichment failures"""
+    def _finalize_batch(self, stored: List[Tuple[str, np.ndarray]], failures: List[Tuple[str, str]]) -> bool:
+        """
+        Persist a processed batch with a single commit.
+
+        Upserts embeddings, marks their tracks completed and records failed
+        tracks in the same transaction. Failures are reported to the backend
+        only after the commit succeeds.
+
+        Returns:
+            True if the transaction committed, False if it was rolled back
+        """
+        if not stored and not failures:
+            return True
+
         cursor = self.db.get_cursor()
         try:
-            # Get track name for better failure visibility
-            cursor.execute('SELECT title FROM "Track" WHERE id = %s', (track_id,))
-            row = cursor.fetchone()
-            track_name = row['title'] if row else None
+            if stored:
+                # Pass arrays straight through: register_vector() adapts
+                # np.ndarray to pgvector without a Python float list.
+                values = [
+                    (track_id, embedding)
+                    for track_id, embedding in stored
+                ]
+
+                # One statement for the whole batch: execute_values otherwise
+                # splits into pages of 100 rows
+                execute_values(cursor, """
+                    INSERT INTO track_embeddings (track_id, embedding, model_version, analyzed_at)
+                    VALUES %s
+                    ON CONFLICT (track_id)
+                    DO UPDATE SET
+                        embedding = EXCLUDED.embedding,
+                        model_version = EXCLUDED.model_version,
+                        analyzed_at = EXCLUDED.analyzed_at
+                """, values, template=EMBEDDING_ROW_TEMPLATE, page_size=len(values))
+
+                cursor.execute("""
+                    UPDATE "Track"
+                    SET
+                        "vibeAnalysisStatus" = 'completed',
+                        "vibeAnalysisStatusUpdatedAt" = NOW()
+                    WHERE id = ANY(%s)
+                """, ([track_id for track_id, _ in stored],))
+
+            track_names = self._record_failures(cursor, failures)
+            self.db.commit()
 
-            cursor.execute("""
-                UPDATE "Track"
-                SET
-                    "vibeAnalysisStatus" = 'failed',
-                    "vibeAnalysisError" = %s,
-                    "vibeAnalysisRetryCount" = COALESCE("vibeAnalysisRetryCount", 0) + 1,
-                    "vibeAnalysisStatusUpdatedAt" = %s
-                WHERE id = %s
-            """, (error[:500], datetime.utcnow(), track_id))
+        except Exception as e:
+            track_ids = ", ".join(track_id for track_id, _ in stored)
+            logger.error(f"Failed to store embeddings for {track_ids}: {e}")
+            traceback.print_exc()
+            self.db.rollback()
+            return False
+        finally:
+            cursor.close()
+
+        self._report_failures(failures, track_names)
+        return True
+
+    def _mark_failed(self, failures: List[Tuple[str, str]]):
+        """Mark (track_id, error) pairs as failed and record in enrichment failures"""
+        cursor = self.db.get_cursor()
+        try:
+            track_names = self._record_failures(cursor, failures)
             self.db.commit()
-            logger.error(f"Track {track_id} failed: {error}")
+        except Exception as e:
+            logger.error(f"Failed to mark track as failed: {e}")
+            self.db.rollback()
+            return
+        finally:
+            cursor.close()
+
+        self._report_failures(failures, track_names)
+
+    @staticmethod
+    def _record_failures(cursor, failures: List[Tuple[str, str]]) -> Dict[str, Optional[str]]:
+        """
+        Mark tracks as failed within the caller's transaction.
 
-            # Report failure to backend enrichment failure service
+        Returns:
+            Track titles keyed by id, for better failure visibility
+        """
+        if not failures:
+            return {}
+
+        rows = execute_values(cursor, """
+            UPDATE "Track" AS t
+            SET
+                "vibeAnalysisStatus" = 'failed',
+                "vibeAnalysisError" = v.error,
+                "vibeAnalysisRetryCount" = COALESCE(t."vibeAnalysisRetryCount", 0) + 1,
+                "vibeAnalysisStatusUpdatedAt" = NOW()
+            FROM (VALUES %s) AS v(id, error)
+            WHERE t.id = v.id
+            RETURNING t.id, t.title
+        """, [(track_id, error[:500]) for track_id, error in failures], page_size=len(failures), fetch=True)
+
+        return {row['id']: row['title'] for row in rows}
+
+    def _report_failures(self, failures: List[Tuple[str, str]], track_names: Dict[str, Optional[str]]):
+        """Report failed tracks to the backend enrichment failure service"""
+        headers = {
+            "Content-Type": "application/json",
+            "X-Internal-Secret": os.getenv("INTERNAL_API_SECRET", "")
+        }
+        for track_id, error in failures:
+            logger.error(f"Track {track_id} failed: {error}")
             try:
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Internal-Secret": os.getenv("INTERNAL_API_SECRET", "")
-                }
                 requests.post(
                     f"{BACKEND_URL}/api/analysis/vibe/failure",
                     json={
                         "trackId": track_id,
-                        "trackName": track_name,
+                        "trackName": track_names.get(track_id),
                         "errorMessage": error[:500],
                         "errorCode": "VIBE_EMBEDDING_FAILED"
                     },
@@ -516,40 +1428,6 @@ class Worker:
             except Exception as report_err:
                 logger.warning(f"Failed to report failure to backend: {report_err}")
 
-        except Exception as e:
-            logger.error(f"Failed to mark track as failed: {e}")
-            self.db.rollback()
-        finally:
-            cursor.close()
-
-    def _store_embedding(self, track_id: str, embedding: np.ndarray) -> bool:
-        """Store the embedding in the track_embeddings table"""
-        cursor = self.db.get_cursor()
-        try:
-            # Convert numpy array to list for pgvector
-            embedding_list = embedding.tolist()
-
-            cursor.execute("""
-                INSERT INTO track_embeddings (track_id, embedding, model_version, analyzed_at)
-                VALUES (%s, %s::vector, %s, %s)
-                ON CONFLICT (track_id)
-                DO UPDATE SET
-                    embedding = EXCLUDED.embedding,
-                    model_version = EXCLUDED.model_version,
-                    analyzed_at = EXCLUDED.analyzed_at
-            """, (track_id, embedding_list, MODEL_VERSION, datetime.utcnow()))
-
-            self.db.commit()
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to store embedding for {track_id}: {e}")
-            traceback.print_exc()
-            self.db.rollback()
-            return False
-        finally:
-            cursor.close()
-
 
 class TextEmbedHandler:
     """
@@ -559,10 +1437,17 @@ class TextEmbedHandler:
     request-scoped Redis list response key, then acknowledges the stream entry.
     """
 
-    def __init__(self, analyzer: CLAPAnalyzer, stop_event: threading.Event):
+    def __init__(
+        self,
+        analyzer: CLAPAnalyzer,
+        stop_event: threading.Event,
+        control_handler: Optional['ControlHandler'] = None,
+    ):
         """Initialize stream-consumer identity and handler dependencies."""
         self.analyzer = analyzer
         self.stop_event = stop_event
+        # Control messages are drained between stream reads on this thread
+        self.control_handler = control_handler
         self.redis_client = None
         consumer_prefix = os.getenv('TEXT_EMBED_CONSUMER_PREFIX', os.getenv('HOSTNAME', 'clap'))
         self.consumer_name = f"{consumer_prefix}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
@@ -574,7 +1459,17 @@ class TextEmbedHandler:
 
         try:
             self.redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-            self._ensure_consumer_group()
+            if self.control_handler:
+                try:
+                    self.control_handler.subscribe()
+                except redis.exceptions.RedisError as e:
+                    # poll() below subscribes again lazily
+                    logger.error(f"Failed to subscribe to control channel: {e}")
+            try:
+                self._ensure_consumer_group()
+            except redis.exceptions.RedisError as e:
+                # A NOGROUP read in the loop below recreates it
+                logger.error(f"Failed to create text embed consumer group: {e}")
 
             logger.info(
                 f"Text embed consumer ready: stream={TEXT_EMBED_REQUEST_STREAM}, "
@@ -596,10 +1491,7 @@ class TextEmbedHandler:
                         block=1000,
                     )
 
-                    if not messages:
-                        continue
-
-                    for _stream_name, entries in messages:
+                    for _stream_name, entries in messages or []:
                         for message_id, fields in entries:
                             self._handle_message(message_id, fields)
                 except redis.exceptions.ResponseError as e:
@@ -607,17 +1499,28 @@ class TextEmbedHandler:
                         logger.warning(
                             "Text embed stream/group missing (likely Redis reset); recreating consumer group"
                         )
-                        self._ensure_consumer_group()
+                        try:
+                            self._ensure_consumer_group()
+                        except redis.exceptions.RedisError as group_error:
+                            logger.error(f"Failed to recreate text embed consumer group: {group_error}")
                         time.sleep(0.5)
-                        continue
-                    raise
+                    else:
+                        logger.error(f"TextEmbedHandler Redis error: {e}")
+                        time.sleep(1)
 
                 except Exception as e:
                     logger.error(f"TextEmbedHandler error: {e}")
                     traceback.print_exc()
                     time.sleep(1)
 
+                # Outside the try: a failing text request must not starve
+                # control signals; poll() handles its own errors
+                if self.control_handler:
+                    self.control_handler.poll()
+
         finally:
+            if self.control_handler:
+                self.control_handler.close()
             logger.info("TextEmbedHandler stopped")
 
     def _ensure_consumer_group(self):
@@ -769,35 +1672,48 @@ class ControlHandler:
         self.redis_client = None
         self.pubsub = None
 
-    def start(self):
-        """Start listening for control messages"""
-        logger.info("ControlHandler starting...")
+    def subscribe(self):
+        """Subscribe to the control channel"""
+        redis_client = redis.from_url(REDIS_URL)
+        pubsub = redis_client.pubsub()
+        pubsub.subscribe(CONTROL_CHANNEL)
+        self.redis_client, self.pubsub = redis_client, pubsub
+        logger.info(f"Subscribed to control channel: {CONTROL_CHANNEL}")
 
+    def poll(self, timeout: float = 0.0):
+        """Handle at most one pending control message, waiting up to timeout"""
         try:
-            self.redis_client = redis.from_url(REDIS_URL)
-            self.pubsub = self.redis_client.pubsub()
-            self.pubsub.subscribe(CONTROL_CHANNEL)
-            logger.info(f"Subscribed to control channel: {CONTROL_CHANNEL}")
+            # Subscribes lazily if Redis was unavailable at startup
+            if self.pubsub is None:
+                self.subscribe()
+            message = self.pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=timeout
+            )
 
-            while not self.stop_event.is_set():
-                try:
-                    message = self.pubsub.get_message(
-                        ignore_subscribe_messages=True,
-                        timeout=1.0
-                    )
+            if message and message['type'] == 'message':
+                self._handle_message(message)
 
-                    if message and message['type'] == 'message':
-                        self._handle_message(message)
+        except Exception as e:
+            logger.error(f"ControlHandler error: {e}")
+            traceback.print_exc()
+            time.sleep(1)
 
-                except Exception as e:
-                    logger.error(f"ControlHandler error: {e}")
-                    traceback.print_exc()
-                    time.sleep(1)
+    def close(self):
+        """Close the control subscription"""
+        if self.pubsub:
+            self.pubsub.close()
+        logger.info("ControlHandler stopped")
 
+    def start(self):
+        """Start listening for control messages on a dedicated thread"""
+        logger.info("ControlHandler starting...")
+
+        try:
+            while not self.stop_event.is_set():
+                self.poll(timeout=1.0)
         finally:
-            if self.pubsub:
-                self.pubsub.close()
-            logger.info("ControlHandler stopped")
+            self.close()
 
     def _handle_message(self, message: Dict[str, Any]):
         """Handle a control message"""
@@ -821,6 +1737,62 @@ class ControlHandler:
             traceback.print_exc()
 
 
+def _log_worker_exit(future: Future):
+    """Surface worker crashes that the executor would otherwise swallow."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Worker exited with error: {future.exception()}")
+
+
+def _count_unembedded_tracks(db: DatabaseConnection) -> int:
+    """Count tracks with a file but no CLAP embedding yet."""
+    cursor = db.get_cursor()
+    try:
+        # NOT EXISTS is an anti-join probe on the track_embeddings primary key
+        cursor.execute("""
+            SELECT COUNT(*) AS cnt FROM "Track" t
+            WHERE t."filePath" IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id
+              )
+        """)
+        return cursor.fetchone()['cnt']
+    finally:
+        cursor.close()
+
+
+def _release_idle_model(analyzer: CLAPAnalyzer) -> str:
+    """Park GPU weights in host memory, or unload entirely on CPU."""
+    if analyzer.park_to_cpu():
+        return "parked in host memory"
+    analyzer.unload_model()
+    return "unloaded"
+
+
+def _idle_check_delay(analyzer: CLAPAnalyzer, check_due_at: Optional[float]) -> Optional[float]:
+    """
+    Seconds until the idle monitor next has a decision to make.
+
+    Returns None when nothing is due: load_model() and workers draining the
+    queue notify the monitor, so there is nothing to time out on.
+    """
+    if not analyzer._model_loaded:
+        return None
+
+    now = time.time()
+    deadlines = []
+    if analyzer._parked:
+        if MODEL_IDLE_TIMEOUT > 0:
+            deadlines.append(analyzer.last_work_time + MODEL_IDLE_TIMEOUT * PARKED_UNLOAD_FACTOR - now)
+    else:
+        if check_due_at is not None:
+            deadlines.append(check_due_at - now)
+        if MODEL_IDLE_TIMEOUT > 0:
+            deadlines.append(analyzer.last_work_time + MODEL_IDLE_TIMEOUT - now)
+    if not deadlines:
+        return None
+    return max(1.0, min(deadlines))
+
+
 def main():
     """Main entry point"""
     logger.info("=" * 60)
@@ -828,6 +1800,7 @@ def main():
     logger.info("=" * 60)
     logger.info(f"  Model version: {MODEL_VERSION}")
     logger.info(f"  Music path: {MUSIC_PATH}")
+    logger.info(f"  Role: {CLAP_ROLE}")
     logger.info(f"  Num workers: {NUM_WORKERS}")
     logger.info(f"  Threads per worker: {THREADS_PER_WORKER}")
     logger.info(f"  Sleep interval: {SLEEP_INTERVAL}s")
@@ -844,75 +1817,153 @@ def main():
     def signal_handler(signum, frame):
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         stop_event.set()
+        # Break the idle monitor out of its wait immediately
+        analyzer.notify_state_change()
 
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
 
     threads = []
 
-    # Start worker threads
-    for i in range(NUM_WORKERS):
-        worker = Worker(i, analyzer, stop_event)
-        thread = threading.Thread(target=worker.start, name=f"Worker-{i}")
-        thread.daemon = True
-        thread.start()
-        threads.append(thread)
-        logger.info(f"Started worker thread {i}")
+    # Start workers on one executor. Batches already amortize the model call,
+    # so more worker threads than cores only adds GIL handoffs.
+    num_workers = min(NUM_WORKERS, os.cpu_count() or 1) if SERVES_AUDIO else 0
+    worker_executor = ThreadPoolExecutor(max_workers=max(1, num_workers), thread_name_prefix="Worker")
+    # Workers share one connection pool; each blocked BLPOP holds a single
+    # connection only while it waits
+    worker_redis_pool = redis.ConnectionPool.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        socket_keepalive=True,
+    )
+    worker_futures = []
+    for i in range(num_workers):
+        worker = Worker(i, analyzer, stop_event, worker_redis_pool)
+        future = worker_executor.submit(worker.start)
+        future.add_done_callback(_log_worker_exit)
+        worker_futures.append(future)
+        logger.info(f"Started worker {i}")
+
+    # Control handler listens for worker count changes. It shares the text
+    # embed handler's thread when there is one, draining the control channel
+    # between stream reads instead of running its own poll loop.
+    control_handler = ControlHandler(stop_event)
 
     # Start text embed handler thread
-    text_handler = TextEmbedHandler(analyzer, stop_event)
-    text_thread = threading.Thread(target=text_handler.start, name="TextEmbedHandler")
-    text_thread.daemon = True
-    text_thread.start()
-    threads.append(text_thread)
-    logger.info("Started text embed handler thread")
-
-    # Start control handler thread (listens for worker count changes)
-    control_handler = ControlHandler(stop_event)
-    control_thread = threading.Thread(target=control_handler.start, name="ControlHandler")
-    control_thread.daemon = True
-    control_thread.start()
-    threads.append(control_thread)
-    logger.info("Started control handler thread")
+    if SERVES_TEXT:
+        text_handler = TextEmbedHandler(analyzer, stop_event, control_handler)
+        text_thread = threading.Thread(target=text_handler.start, name="TextEmbedHandler")
+        text_thread.daemon = True
+        text_thread.start()
+        threads.append(text_thread)
+        logger.info("Started text embed handler thread (with control channel)")
+    else:
+        control_thread = threading.Thread(target=control_handler.start, name="ControlHandler")
+        control_thread.daemon = True
+        control_thread.start()
+        threads.append(control_thread)
+        logger.info("Started control handler thread")
 
     # Main loop: monitor idle state and unload model when not needed
     idle_db = DatabaseConnection(DATABASE_URL)
     idle_db.connect()
+    # One pooled client for the life of the process; the pool reconnects
+    # lazily and health checks stale sockets between idle checks
+    idle_redis = redis.Redis.from_url(
+        REDIS_URL,
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+    # Queue drain already checked for remaining work
+    checked_drains = 0
+    # While work remains after a drain, re-check with exponential backoff
+    # (plus jitter) instead of a fixed tick; a new drain resets it
+    recheck_at: Optional[float] = None
+    recheck_backoff = float(SLEEP_INTERVAL)
+    # (count, batches_done, checked_at); only re-queried after workers finish
+    # a batch or once the cached value is older than the idle timeout
+    remaining_cache: Optional[Tuple[int, int, float]] = None
+    remaining_cache_ttl = max(MODEL_IDLE_TIMEOUT, SLEEP_INTERVAL * 2)
+    # Thresholds are fixed for the process; resolve them once
+    quick_check_after = SLEEP_INTERVAL * 2
+    idle_unload_after = MODEL_IDLE_TIMEOUT if MODEL_IDLE_TIMEOUT > 0 else float('inf')
+    parked_unload_after = idle_unload_after * PARKED_UNLOAD_FACTOR
     try:
         while not stop_event.is_set():
-            time.sleep(5)
-            if analyzer._model_loaded:
-                idle_seconds = time.time() - analyzer.last_work_time
-                if idle_seconds >= MODEL_IDLE_TIMEOUT > 0:
+            # Sleep until a state change (load/unload, worker activity, queue
+            # drained, shutdown) or until the next idle threshold is due
+            with analyzer._state_cv:
+                if stop_event.is_set():
+                    break
+                check_due_at = analyzer.last_work_time + quick_check_after
+                if analyzer.queue_drains == checked_drains:
+                    check_due_at = max(check_due_at, recheck_at) if recheck_at is not None else None
+                analyzer._state_cv.wait(timeout=_idle_check_delay(analyzer, check_due_at))
+            if stop_event.is_set():
+                break
+            if not analyzer._model_loaded:
+                continue
+
+            now = time.time()
+            idle_seconds = now - analyzer.last_work_time
+            if analyzer._parked:
+                # Parked weights still hold host RAM; free it after a long idle
+                if idle_seconds >= parked_unload_after:
                     analyzer.unload_model()
-                    logger.info(f"Model idle for {idle_seconds:.0f}s, unloaded to free memory (will reload when work arrives)")
-                elif idle_seconds >= SLEEP_INTERVAL * 2:
-                    # Check if all work is truly done -- unload immediately
-                    try:
-                        cursor = idle_db.get_cursor()
-                        cursor.execute("""
-                            SELECT COUNT(*) as cnt FROM "Track" t
-                            LEFT JOIN track_embeddings te ON t.id = te.track_id
-                            WHERE te.track_id IS NULL AND t."filePath" IS NOT NULL
-                        """)
-                        remaining = cursor.fetchone()['cnt']
-                        cursor.close()
-                        queue_len = redis.from_url(REDIS_URL).llen(ANALYSIS_QUEUE)
-                        if remaining == 0 and queue_len == 0:
-                            analyzer.unload_model()
-                            logger.info("All tracks have embeddings, model unloaded (will reload when work arrives)")
-                    except Exception as e:
-                        logger.debug(f"Idle check failed: {e}")
-                        idle_db.reconnect()
+                    logger.info(f"Parked model idle for {idle_seconds:.0f}s, unloaded to free memory")
+                continue
+
+            if idle_seconds >= idle_unload_after:
+                action = _release_idle_model(analyzer)
+                logger.info(f"Model idle for {idle_seconds:.0f}s, {action} to free memory (will reload when work arrives)")
+                recheck_at = None
+                continue
+
+            if idle_seconds < quick_check_after:
+                continue
+            if analyzer.queue_drains != checked_drains:
+                # Workers just found the queue empty
+                checked_drains = analyzer.queue_drains
+                recheck_backoff = float(SLEEP_INTERVAL)
+            elif recheck_at is None or now < recheck_at:
+                continue
+
+            # Check if all work is truly done -- unload immediately
+            recheck_at = now + recheck_backoff
+            recheck_backoff = min(60.0, recheck_backoff * 2 + random.uniform(0, 0.25 * recheck_backoff))
+            try:
+                batches_done = analyzer.batches_done
+                if (
+                    remaining_cache is None
+                    or remaining_cache[1] != batches_done
+                    or time.time() - remaining_cache[2] >= remaining_cache_ttl
+                ):
+                    remaining_cache = (_count_unembedded_tracks(idle_db), batches_done, time.time())
+                remaining = remaining_cache[0]
+                queue_len = idle_redis.llen(ANALYSIS_QUEUE)
+                if remaining == 0 and queue_len == 0:
+                    action = _release_idle_model(analyzer)
+                    recheck_at = None
+                    logger.info(f"All tracks have embeddings, model {action} (will reload when work arrives)")
+            except redis.exceptions.ConnectionError as e:
+                # The pool drops the broken connection and redials next time
+                logger.debug(f"Idle check Redis connection failed: {e}")
+            except Exception as e:
+                logger.debug(f"Idle check failed: {e}")
+                idle_db.reconnect()
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
         stop_event.set()
 
     # Cleanup
     idle_db.close()
+    idle_redis.close()
 
     # Wait for threads to finish
     logger.info("Waiting for threads to finish...")
+    wait(worker_futures, timeout=10)
+    worker_executor.shutdown(wait=False)
+    worker_redis_pool.disconnect()
     for thread in threads:
         thread.join(timeout=10)
 
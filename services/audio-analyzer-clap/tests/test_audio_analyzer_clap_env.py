@@ -2,7 +2,11 @@ import os
 
 import pytest
 
-from services.common.analyzer_env import configure_thread_env, get_int_env
+from services.common.analyzer_env import (
+    configure_thread_env,
+    get_bool_env,
+    get_int_env,
+)
 
 
 THREAD_ENV_KEYS = [
@@ -23,6 +27,26 @@ def test_get_int_env_reads_env_override(monkeypatch: pytest.MonkeyPatch) -> None
     assert get_int_env("MVR12_TEST_OVERRIDE_INT", 1) == 9
 
 
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("1", True), ("TRUE", True), (" yes ", True), ("on", True), ("0", False), ("off", False)],
+)
+def test_get_bool_env_parses_truthy_values(
+    monkeypatch: pytest.MonkeyPatch, raw: str, expected: bool
+) -> None:
+    monkeypatch.setenv("MVR12_TEST_BOOL", raw)
+    assert get_bool_env("MVR12_TEST_BOOL", not expected) is expected
+
+
+def test_get_bool_env_uses_default_when_missing_or_blank(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("MVR12_TEST_BOOL", raising=False)
+    assert get_bool_env("MVR12_TEST_BOOL", True) is True
+    monkeypatch.setenv("MVR12_TEST_BOOL", "  ")
+    assert get_bool_env("MVR12_TEST_BOOL") is False
+
+
 def test_configure_thread_env_without_tensorflow_sets_only_blas(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -31,8 +55,5 @@ def test_configure_thread_env_without_tensorflow_sets_only_blas(
 
     configure_thread_env(threads_per_worker=2, configure_tensorflow=False)
 
-    for key in THREAD_ENV_KEYS:
-        assert os.environ[key] == "2"
-
-    for key in TF_ENV_KEYS:
-        assert key not in os.environ
+    assert {key: os.environ.get(key) for key in THREAD_ENV_KEYS} == dict.fromkeys(THREAD_ENV_KEYS, "2")
+    assert not any(key in os.environ for key in TF_ENV_KEYS)
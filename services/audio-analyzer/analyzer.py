@@ -22,10 +22,16 @@ from services.common.logging_utils import configure_service_logger
 from services.common.analyzer_env import configure_thread_env, get_int_env
 
 # Get thread configuration from environment (default to 1 for safety)
-THREADS_PER_WORKER = get_int_env('THREADS_PER_WORKER', 1)
+REQUESTED_THREADS_PER_WORKER = get_int_env('THREADS_PER_WORKER', 1)
 
 # Configure TensorFlow and BLAS/OpenMP threading before TensorFlow/Essentia imports.
-configure_thread_env(THREADS_PER_WORKER, configure_tensorflow=True)
+# Capped for the env worker count here; each pool worker re-applies the cap for
+# the pool's actual size (which SystemSettings can change) in _init_worker_process.
+THREADS_PER_WORKER = configure_thread_env(
+    REQUESTED_THREADS_PER_WORKER,
+    configure_tensorflow=True,
+    workers=get_int_env('NUM_WORKERS', 2),
+)
 
 logger = configure_service_logger('audio-analyzer')
 
@@ -63,14 +69,19 @@ It connects to Redis for job queue and PostgreSQL for storing results.
 
 # NOW safe to import other dependencies
 import json
+import logging
 import time
 import gc
+import hashlib
+import io
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 import traceback
 import numpy as np
-from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from numpy.lib.stride_tricks import sliding_window_view
+from services.common.frame_features import frame_rms, frame_zero_crossing_rate
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import multiprocessing
 
 # BrokenProcessPool was added in Python 3.9, provide compatibility for Python 3.8
@@ -94,7 +105,7 @@ except RuntimeError:
 
 import redis
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2.extras import execute_values
 
 # Essentia imports (will fail gracefully if not installed for testing)
 ESSENTIA_AVAILABLE = False
@@ -108,6 +119,25 @@ try:
 except ImportError as e:
     logger.warning(f"Essentia not available: {e}")
 
+# scipy (optional): scipy.fft (pocketfft) releases the GIL, honours a worker
+# thread count and keeps float32 input in single precision; scipy.signal gives a
+# polyphase 44.1kHz -> 16kHz resampler. numpy.fft / Essentia Resample are fallbacks.
+SCIPY_AVAILABLE = False
+try:
+    import scipy.fft as _fft
+    from scipy.signal import firwin, resample_poly
+    _RFFT_KWARGS = {'workers': THREADS_PER_WORKER, 'overwrite_x': True}
+    SCIPY_AVAILABLE = True
+except ImportError:
+    _fft = np.fft
+    _RFFT_KWARGS = {}
+
+# orjson (optional): C JSON codec for queue payloads; redis-py takes the bytes as-is
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # TensorFlow models via Essentia
 # NOTE: TF is NOT imported in the main process to save ~300MB RAM.
 # Worker processes import TF independently via spawn mode.
@@ -126,8 +156,9 @@ SLEEP_INTERVAL = get_int_env('SLEEP_INTERVAL', 5)
 
 # BRPOP timeout: how long to block waiting for work (seconds)
 # Also serves as the DB reconciliation interval
-# Uses SLEEP_INTERVAL for backward compatibility, minimum 5s
-BRPOP_TIMEOUT = max(5, get_int_env('BRPOP_TIMEOUT', SLEEP_INTERVAL))
+# Defaults to 10s (or SLEEP_INTERVAL if larger), minimum 5s; short timeouts
+# only add unblock/re-block churn on the Redis main thread while idle
+BRPOP_TIMEOUT = max(5, get_int_env('BRPOP_TIMEOUT', max(10, SLEEP_INTERVAL)))
 
 # DB reconciliation cadence (adaptive backoff while idle)
 DB_RECONCILE_MIN_INTERVAL_SECONDS = max(
@@ -157,6 +188,23 @@ RESIZE_DEBOUNCE_SECONDS = 5
 MAX_FILE_SIZE_MB = get_int_env('MAX_FILE_SIZE_MB', 500)
 # Hard timeout for an entire analysis batch before remaining tracks are failed permanently.
 BATCH_ANALYSIS_TIMEOUT_SECONDS = get_int_env('BATCH_ANALYSIS_TIMEOUT_SECONDS', 900)
+# Finished tracks are saved in groups while a batch runs: once this many
+# outcomes are buffered, or the oldest has waited RESULT_FLUSH_SECONDS
+RESULT_FLUSH_SIZE = max(1, get_int_env('RESULT_FLUSH_SIZE', 5))
+RESULT_FLUSH_SECONDS = max(1, get_int_env('RESULT_FLUSH_SECONDS', 5))
+
+# Max audio duration analyzed per track (seconds from the start of the file)
+MAX_ANALYZE_SECONDS = get_int_env('MAX_ANALYZE_SECONDS', 90)
+
+# Optional on-disk cache of analysis results (keyed by a file content
+# fingerprint) and MusiCNN embeddings (keyed by a hash of the decoded clip), so
+# re-scanned, moved, or re-queued tracks skip re-analysis. Empty disables it.
+ANALYSIS_CACHE_DIR = os.getenv('ANALYSIS_CACHE_DIR', '')
+ANALYSIS_CACHE_MAX_MB = get_int_env('ANALYSIS_CACHE_MAX_MB', 512)
+
+# Frame layout for the energy/spectral features (44.1kHz input)
+FEATURE_FRAME_SIZE = 2048
+FEATURE_HOP_SIZE = 1024
 
 
 class DatabaseConnection:
@@ -180,11 +228,12 @@ class DatabaseConnection:
         self.conn.autocommit = False
         logger.info("Connected to PostgreSQL with UTF-8 encoding")
 
-    def get_cursor(self) -> RealDictCursor:
+    def get_cursor(self):
         """Get a database cursor"""
-        if not self.conn:
+        # Reconnect if the server dropped the connection (e.g. Postgres restart)
+        if not self.conn or self.conn.closed:
             self.connect()
-        return self.conn.cursor(cursor_factory=RealDictCursor)
+        return self.conn.cursor()
 
     def commit(self):
         """Commit transaction"""
@@ -193,7 +242,7 @@ class DatabaseConnection:
 
     def rollback(self):
         """Rollback transaction"""
-        if self.conn:
+        if self.conn and not self.conn.closed:
             self.conn.rollback()
 
     def close(self):
@@ -208,24 +257,20 @@ def _get_workers_from_db() -> int:
     Fetch worker count from SystemSettings table.
     Falls back to env var or default if database query fails.
     """
+    db = DatabaseConnection(DATABASE_URL)
     try:
-        db = DatabaseConnection(DATABASE_URL)
         db.connect()
-        cursor = db.get_cursor()
-        
-        cursor.execute("""
-            SELECT "audioAnalyzerWorkers"
-            FROM "SystemSettings"
-            WHERE id = 'default'
-            LIMIT 1
-        """)
-        
-        result = cursor.fetchone()
-        cursor.close()
-        db.close()
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT "audioAnalyzerWorkers"
+                FROM "SystemSettings"
+                WHERE id = 'default'
+                LIMIT 1
+            """)
+            result = cursor.fetchone()
         
-        if result and result['audioAnalyzerWorkers'] is not None:
-            workers = int(result['audioAnalyzerWorkers'])
+        if result and result[0] is not None:
+            workers = int(result[0])
             # Validate range (1-8)
             workers = max(1, min(8, workers))
             logger.info(f"Loaded worker count from database: {workers}")
@@ -238,16 +283,36 @@ def _get_workers_from_db() -> int:
         logger.warning(f"Failed to fetch worker count from database: {e}")
         logger.info("Falling back to env var or default")
         return get_int_env('NUM_WORKERS', DEFAULT_WORKERS)
+    finally:
+        db.close()
 # Conservative default: 2 workers (stable on any system)
 # Previous default used auto-scaling which could cause OOM on memory-constrained systems
 DEFAULT_WORKERS = 2
-# Try to load from database first, fall back to env var or default
-NUM_WORKERS = _get_workers_from_db()
+# Try to load from database first, fall back to env var or default.
+# Spawned pool workers re-import this module but never size the pool, so
+# only the parent process pays for the startup DB connection.
+if multiprocessing.parent_process() is None:
+    NUM_WORKERS = _get_workers_from_db()
+else:
+    NUM_WORKERS = get_int_env('NUM_WORKERS', DEFAULT_WORKERS)
 ESSENTIA_VERSION = '2.1b6-enhanced-v3'
+# Row template for batched result updates. Casts keep all-NULL columns in a
+# VALUES list typed; the constant version is inlined so it isn't bound per row
+TRACK_RESULT_ROW_TEMPLATE = (
+    "(%s, %s::double precision, %s::integer, %s::text, %s::text, %s::double precision, "
+    "%s::double precision, %s::double precision, %s::double precision, %s::double precision, "
+    "%s::double precision, %s::double precision, %s::double precision, %s::double precision, "
+    "%s::double precision, %s::text[], %s::text[], %s::double precision, %s::double precision, "
+    "%s::double precision, %s::double precision, %s::double precision, %s::double precision, "
+    "%s::double precision, %s::double precision, %s::text, %s::timestamp, "
+    f"'{ESSENTIA_VERSION}')"
+)
 
 # Retry configuration
 MAX_RETRIES = get_int_env('MAX_RETRIES', 3)  # Max retry attempts per track
 STALE_PROCESSING_MINUTES = get_int_env('STALE_PROCESSING_MINUTES', 15)  # Reset tracks stuck in 'processing' (synchronized with backend)
+# Row template for batched failure writes: (track_id, error, permanent, failure_id)
+FAILURE_ROW_TEMPLATE = f"(%s, %s, %s::boolean, %s, {MAX_RETRIES})"
 
 # Queue names
 ANALYSIS_QUEUE = 'audio:analysis:queue'
@@ -293,11 +358,23 @@ class AudioAnalyzer:
     - Standard: Uses heuristics when models aren't available (fallback)
     """
     
+    # Mood classification heads -> result keys, in reporting order
+    _MOOD_MODEL_MAP = (
+        ('mood_happy', 'moodHappy'),
+        ('mood_sad', 'moodSad'),
+        ('mood_relaxed', 'moodRelaxed'),
+        ('mood_aggressive', 'moodAggressive'),
+        ('mood_party', 'moodParty'),
+        ('mood_acoustic', 'moodAcoustic'),
+        ('mood_electronic', 'moodElectronic'),
+    )
+    
     def __init__(self):
         """Initialize feature extractors and load ML models when available."""
         self.enhanced_mode = False
         self.musicnn_model = None  # Base MusiCNN model
         self.prediction_models = {}  # Classification head models
+        self._head_executor = None  # Runs classification heads concurrently
         
         if ESSENTIA_AVAILABLE:
             self._init_essentia()
@@ -312,14 +389,23 @@ class AudioAnalyzer:
         self.dynamic_complexity = es.DynamicComplexity()
         self.danceability_extractor = es.Danceability()
         
-        # Additional extractors for better Standard mode
-        self.spectral_centroid = es.Centroid(range=22050)  # For brightness
-        self.spectral_flatness = es.FlatnessDB()  # For instrumentalness
-        self.zcr = es.ZeroCrossingRate()  # For speechiness
-        self.rms = es.RMS()  # For proper energy calculation
-        self.spectrum = es.Spectrum()
-        self.windowing = es.Windowing(type='hann')
-        self.resampler = es.Resample(inputSampleRate=44100, outputSampleRate=16000)
+        # Frame features (RMS, ZCR, centroid, flatness) are computed in one
+        # vectorized pass over all frames; the Hann window is shared.
+        self._hann = np.hanning(FEATURE_FRAME_SIZE).astype(np.float32)
+        n_bins = FEATURE_FRAME_SIZE // 2 + 1
+        self._freqs = np.linspace(0, 22050, n_bins, dtype=np.float32)
+        # Reusable buffers sized for the longest clip analyze() loads
+        max_frames = max(1, (44100 * MAX_ANALYZE_SECONDS - FEATURE_FRAME_SIZE) // FEATURE_HOP_SIZE)
+        self._frame_buf = np.empty((max_frames, FEATURE_FRAME_SIZE), dtype=np.float32)
+        self._spec_buf = np.empty((max_frames, n_bins), dtype=np.float32)
+        if SCIPY_AVAILABLE:
+            # 44100 * 160 / 441 = 16000. Same Kaiser low-pass resample_poly
+            # designs by default, built once instead of on every call.
+            self._resample_fir = firwin(
+                2 * 10 * 441 + 1, 1.0 / 441, window=('kaiser', 5.0)
+            ).astype(np.float32)
+        else:
+            self.resampler = es.Resample(inputSampleRate=44100, outputSampleRate=16000)
 
         logger.info("Essentia basic algorithms initialized")
     
@@ -349,7 +435,8 @@ class AudioAnalyzer:
                 try:
                     self.musicnn_model = TensorflowPredictMusiCNN(
                         graphFilename=MODELS['musicnn'],
-                        output="model/dense/BiasAdd"  # Embedding layer output
+                        output="model/dense/BiasAdd",  # Embedding layer output
+                        batchSize=-1,  # All patches of a clip in one session run
                     )
                     logger.info("Loaded base MusiCNN model for embeddings")
                 except Exception as e:
@@ -384,7 +471,8 @@ class AudioAnalyzer:
                     try:
                         self.prediction_models[model_name] = TensorflowPredict2D(
                             graphFilename=model_path,
-                            output="model/Softmax"
+                            output="model/Softmax",
+                            batchSize=-1,
                         )
                         logger.info(f"Loaded classification head: {model_name}")
                     except Exception as e:
@@ -398,6 +486,12 @@ class AudioAnalyzer:
             if all(m in self.prediction_models for m in required):
                 self.enhanced_mode = True
                 logger.info(f"ENHANCED MODE ENABLED - {len(self.prediction_models)} MusiCNN classification heads loaded")
+                # Heads are independent; spread them over the worker's thread budget
+                if THREADS_PER_WORKER > 1:
+                    self._head_executor = ThreadPoolExecutor(
+                        max_workers=min(THREADS_PER_WORKER, len(self.prediction_models)),
+                        thread_name_prefix='musicnn-head',
+                    )
             else:
                 missing = [m for m in required if m not in self.prediction_models]
                 logger.warning(f"Missing required models: {missing} - using Standard mode")
@@ -416,12 +510,15 @@ class AudioAnalyzer:
             return None
 
         try:
-            loader = es.MonoLoader(filename=file_path, sampleRate=44100)
-            audio = loader()
-            max_samples = int(44100 * max_duration)
-            if len(audio) > max_samples:
-                audio = audio[:max_samples]
-            return audio
+            # EasyLoader stops decoding at endTime, so long files are never
+            # fully decoded just to keep the first max_duration seconds.
+            loader = es.EasyLoader(
+                filename=file_path,
+                sampleRate=44100,
+                endTime=float(max_duration),
+            )
+            # Framing, einsum and the float32 buffers expect contiguous float32
+            return np.ascontiguousarray(loader(), dtype=np.float32)
         except Exception as e:
             logger.error(f"Failed to load audio {file_path}: {e}")
             return None
@@ -442,20 +539,18 @@ class AudioAnalyzer:
             if len(audio) == 0:
                 return (False, "Audio is empty")
 
-            if np.any(np.isnan(audio)) or np.any(np.isinf(audio)):
+            if not np.isfinite(audio).all():
                 return (False, "Audio contains NaN or Inf values (corrupted)")
 
             # Silence detection using vectorized RMS over chunks
             try:
-                frame_size = 2048
-                hop_size = 1024
+                frame_size = FEATURE_FRAME_SIZE
+                hop_size = FEATURE_HOP_SIZE
                 n_frames = max(1, (len(audio) - frame_size) // hop_size)
                 # Vectorized: compute RMS per frame using stride tricks
-                silent_count = 0
-                for i in range(0, min(n_frames * hop_size, len(audio) - frame_size), hop_size):
-                    rms_val = self.rms(audio[i:i + frame_size])
-                    if rms_val < 0.001:
-                        silent_count += 1
+                frames = sliding_window_view(audio, frame_size)[::hop_size][:n_frames]
+                rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_size)
+                silent_count = int(np.count_nonzero(rms < 0.001))
 
                 if n_frames > 0 and silent_count / n_frames > 0.8:
                     ratio = silent_count / n_frames * 100
@@ -509,7 +604,6 @@ class AudioAnalyzer:
             result['_error'] = 'Essentia library not installed'
             return result
 
-        MAX_ANALYZE_SECONDS = get_int_env('MAX_ANALYZE_SECONDS', 90)
         audio_44k = None
         try:
             audio_44k = self.load_audio(file_path, max_duration=MAX_ANALYZE_SECONDS)
@@ -564,28 +658,36 @@ class AudioAnalyzer:
                 result['keyScale'] = scale
                 result['keyStrength'] = 0.0
 
-            # Energy & Spectral features - frame-based extraction
-            frame_size = 2048
-            hop_size = 1024
-            n_frames = max(0, (len(audio_44k) - frame_size) // hop_size)
-
-            rms_values = np.empty(n_frames, dtype=np.float32)
-            zcr_values = np.empty(n_frames, dtype=np.float32)
-            sc_values = np.empty(n_frames, dtype=np.float32)
-            sf_values = np.empty(n_frames, dtype=np.float32)
-
-            for idx in range(n_frames):
-                offset = idx * hop_size
-                frame = audio_44k[offset:offset + frame_size]
-                windowed = self.windowing(frame)
-                spectrum = self.spectrum(windowed)
-
-                rms_values[idx] = self.rms(frame)
-                zcr_values[idx] = self.zcr(frame)
-                sc_values[idx] = self.spectral_centroid(spectrum)
-                sf_values[idx] = self.spectral_flatness(spectrum)
+            # Energy & Spectral features - frame-based extraction, vectorized
+            # across all frames instead of one Essentia call per frame.
+            frame_size = FEATURE_FRAME_SIZE
+            hop_size = FEATURE_HOP_SIZE
+            n_frames = min(
+                max(0, (len(audio_44k) - frame_size) // hop_size),
+                len(self._frame_buf),
+            )
 
             if n_frames > 0:
+                frames = sliding_window_view(audio_44k, frame_size)[::hop_size][:n_frames]
+
+                # Time-domain features use the raw frames
+                rms_values = frame_rms(frames)
+                zcr_values = frame_zero_crossing_rate(frames)
+
+                # Magnitude spectrum of the Hann-windowed frames
+                windowed = np.multiply(frames, self._hann, out=self._frame_buf[:n_frames])
+                spec = np.abs(_fft.rfft(windowed, axis=1, **_RFFT_KWARGS), out=self._spec_buf[:n_frames])
+                spec_sum = np.sum(spec, axis=1)
+                sc_values = np.divide(
+                    spec @ self._freqs, spec_sum,
+                    out=np.zeros_like(spec_sum), where=spec_sum > 0,
+                )
+                # Flatness in dB: geometric / arithmetic mean of the spectrum
+                geo_mean = np.exp(np.mean(np.log(spec + 1e-10), axis=1))
+                arith_mean = np.maximum(spec_sum / spec.shape[1], 1e-10)
+                sf_values = 10 * np.log10(np.maximum(geo_mean / arith_mean, 1e-10))
+                del frames, windowed, spec
+
                 avg_rms = float(np.mean(rms_values))
                 result['energy'] = round(min(1.0, avg_rms * 3), 3)
                 avg_sc = float(np.mean(sc_values))
@@ -616,7 +718,7 @@ class AudioAnalyzer:
             if self.enhanced_mode:
                 try:
                     # Resample in-memory instead of re-reading from disk
-                    audio_16k = self.resampler(audio_44k)
+                    audio_16k = self._resample_to_16k(audio_44k)
                     ml_features = self._extract_ml_features(audio_16k)
                     result.update(ml_features)
                     # In enhanced mode, prefer the ML danceability prediction when available.
@@ -646,6 +748,37 @@ class AudioAnalyzer:
                 result.pop(k, None)
         return result
     
+    def _resample_to_16k(self, audio_44k: np.ndarray) -> np.ndarray:
+        """Resample 44.1kHz mono audio to the 16kHz rate MusiCNN expects."""
+        if SCIPY_AVAILABLE:
+            audio_16k = resample_poly(audio_44k, 160, 441, window=self._resample_fir)
+        else:
+            audio_16k = self.resampler(audio_44k)
+        return np.ascontiguousarray(audio_16k, dtype=np.float32)
+
+    def _compute_embeddings(self, audio_16k: np.ndarray) -> np.ndarray:
+        """Run MusiCNN, reusing cached embeddings for an identical clip."""
+        cache_path = None
+        if ANALYSIS_CACHE_DIR:
+            digest = hashlib.blake2b(np.ascontiguousarray(audio_16k), digest_size=20)
+            digest.update(ESSENTIA_VERSION.encode())
+            cache_path = os.path.join(ANALYSIS_CACHE_DIR, f"{digest.hexdigest()}.npy")
+            try:
+                embeddings = np.load(cache_path)
+                os.utime(cache_path)  # Mark as recently used for LRU pruning
+                logger.debug(f"Using cached MusiCNN embeddings: {cache_path}")
+                return embeddings
+            except (OSError, ValueError):
+                pass
+
+        embeddings = self.musicnn_model(audio_16k)
+
+        if cache_path:
+            buf = io.BytesIO()
+            np.save(buf, embeddings)
+            _write_cache_file(cache_path, buf.getvalue())
+        return embeddings
+
     def _extract_ml_features(self, audio_16k: np.ndarray) -> Dict[str, Any]:
         """
         Extract features using Essentia MusiCNN + classification heads.
@@ -666,13 +799,10 @@ class AudioAnalyzer:
         if not self.musicnn_model:
             raise ValueError("MusiCNN model not loaded")
         
-        def safe_predict(model, embeddings, model_name: str) -> Tuple[float, float]:
+        def safe_predict(model, embeddings, model_name: str) -> Optional[np.ndarray]:
             """
-            Safely extract prediction and return (value, confidence).
-            
-            Returns:
-                (value, variance) - value is the mean prediction, variance indicates confidence
-                High variance = model is uncertain across frames
+            Safely run a classification head and return its per-frame
+            positive-class probabilities, or None if prediction failed.
             """
             try:
                 preds = model(embeddings)
@@ -698,106 +828,101 @@ class AudioAnalyzer:
                     ]
                     else 1
                 )
-                positive_probs = preds[:, positive_col]
-                raw_value = float(np.mean(positive_probs))
-                variance = float(np.var(positive_probs))
-                # Clamp to valid probability range
-                clamped = max(0.0, min(1.0, raw_value))
-                return (round(clamped, 3), round(variance, 4))
+                return np.asarray(preds)[:, positive_col]
             except Exception as e:
                 logger.warning(f"Prediction failed for {model_name}: {e}")
-                return (0.5, 0.0)
+                return None
         
         # Step 1: Get embeddings from base MusiCNN model
         # Output shape: [frames, 200] - 200-dimensional embedding per frame
-        embeddings = self.musicnn_model(audio_16k)
+        embeddings = self._compute_embeddings(audio_16k)
         logger.debug(f"MusiCNN embeddings shape: {embeddings.shape}")
         
         # Step 2: Pass embeddings through classification heads
-        # Each head outputs [frames, 2] where [:, 1] is probability of positive class
+        # Each head outputs [frames, 2]; heads share the embeddings and are
+        # independent, so they run concurrently when a head executor exists.
+        if self._head_executor is not None:
+            futures = {
+                name: self._head_executor.submit(safe_predict, model, embeddings, name)
+                for name, model in self.prediction_models.items()
+            }
+            head_probs = {name: future.result() for name, future in futures.items()}
+        else:
+            head_probs = {
+                name: safe_predict(model, embeddings, name)
+                for name, model in self.prediction_models.items()
+            }
+        
+        # Reduce all heads at once: (value, variance) per head, where value is the
+        # clamped mean prediction and high variance = model is uncertain across frames.
+        # Failed heads fall back to (0.5, 0.0).
+        head_preds = {name: (0.5, 0.0) for name in head_probs}
+        ok_names = [name for name, probs in head_probs.items() if probs is not None]
+        if ok_names:
+            probs = np.stack([head_probs[name] for name in ok_names])
+            values = np.clip(probs.mean(axis=1), 0.0, 1.0).round(3).tolist()
+            variances = probs.var(axis=1).round(4).tolist()
+            head_preds.update(zip(ok_names, zip(values, variances)))
         
         # === MOOD PREDICTIONS ===
         # Collect raw predictions with their variances
         raw_moods = {}
+        for head_name, mood_key in self._MOOD_MODEL_MAP:
+            pred = head_preds.get(head_name)
+            if pred is not None:
+                raw_moods[mood_key] = pred
         
-        if 'mood_happy' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_happy'], embeddings, 'mood_happy')
-            raw_moods['moodHappy'] = (val, var)
-        
-        if 'mood_sad' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_sad'], embeddings, 'mood_sad')
-            raw_moods['moodSad'] = (val, var)
-        
-        if 'mood_relaxed' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_relaxed'], embeddings, 'mood_relaxed')
-            raw_moods['moodRelaxed'] = (val, var)
-        
-        if 'mood_aggressive' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_aggressive'], embeddings, 'mood_aggressive')
-            raw_moods['moodAggressive'] = (val, var)
-        
-        if 'mood_party' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_party'], embeddings, 'mood_party')
-            raw_moods['moodParty'] = (val, var)
-        
-        if 'mood_acoustic' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_acoustic'], embeddings, 'mood_acoustic')
-            raw_moods['moodAcoustic'] = (val, var)
-        
-        if 'mood_electronic' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['mood_electronic'], embeddings, 'mood_electronic')
-            raw_moods['moodElectronic'] = (val, var)
-        
-        # Log raw mood predictions for debugging
-        raw_values = {k: v[0] for k, v in raw_moods.items()}
-        logger.info(f"ML Raw Moods: H={raw_values.get('moodHappy')}, S={raw_values.get('moodSad')}, R={raw_values.get('moodRelaxed')}, A={raw_values.get('moodAggressive')}")
+        # Log raw mood predictions for debugging (skip the formatting when INFO is muted)
+        if logger.isEnabledFor(logging.INFO):
+            raw_values = {k: v[0] for k, v in raw_moods.items()}
+            logger.info(f"ML Raw Moods: H={raw_values.get('moodHappy')}, S={raw_values.get('moodSad')}, R={raw_values.get('moodRelaxed')}, A={raw_values.get('moodAggressive')}")
         
         # === DETECT UNRELIABLE PREDICTIONS ===
         # MusiCNN was trained on pop/rock (MSD). For classical/piano/ambient music,
         # the model often outputs high values for ALL contradictory moods.
         # Detect this and normalize ALL moods to preserve relative ordering.
         all_mood_keys = list(raw_moods.keys())
-        all_mood_values = [raw_moods[m][0] for m in all_mood_keys]
 
-        if len(all_mood_values) >= 4:
-            min_mood = min(all_mood_values)
-            max_mood = max(all_mood_values)
+        if len(all_mood_keys) >= 4:
+            mood_values = np.array([raw_moods[m][0] for m in all_mood_keys])
+            min_mood = float(mood_values.min())
+            max_mood = float(mood_values.max())
 
             if min_mood > 0.7 and (max_mood - min_mood) < 0.3:
                 logger.warning(f"Detected out-of-distribution audio: all moods high ({min_mood:.2f}-{max_mood:.2f}). Normalizing...")
 
-                for mood_key in all_mood_keys:
-                    old_val = raw_moods[mood_key][0]
-                    if max_mood > min_mood:
-                        normalized = 0.2 + (old_val - min_mood) / (max_mood - min_mood) * 0.6
-                    else:
-                        normalized = 0.5
-                    raw_moods[mood_key] = (round(normalized, 3), raw_moods[mood_key][1])
+                if max_mood > min_mood:
+                    normalized = (0.2 + (mood_values - min_mood) * (0.6 / (max_mood - min_mood))).round(3)
+                else:
+                    normalized = np.full(len(all_mood_keys), 0.5)
+                for mood_key, value in zip(all_mood_keys, normalized.tolist()):
+                    raw_moods[mood_key] = (value, raw_moods[mood_key][1])
 
-                logger.info(f"Normalized moods: H={raw_moods.get('moodHappy', (0,0))[0]}, S={raw_moods.get('moodSad', (0,0))[0]}, R={raw_moods.get('moodRelaxed', (0,0))[0]}, A={raw_moods.get('moodAggressive', (0,0))[0]}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Normalized moods: H={raw_moods.get('moodHappy', (0,0))[0]}, S={raw_moods.get('moodSad', (0,0))[0]}, R={raw_moods.get('moodRelaxed', (0,0))[0]}, A={raw_moods.get('moodAggressive', (0,0))[0]}")
         
-        # Store final mood values in result
-        for mood_key, (val, var) in raw_moods.items():
-            result[mood_key] = val
+        # Store final mood values in result; the snapshot feeds valence/arousal below
+        final_moods = {k: v[0] for k, v in raw_moods.items()}
+        result.update(final_moods)
         
         # === VALENCE (derived from mood models) ===
         # Valence = emotional positivity: happy/party vs sad
-        happy = result.get('moodHappy', 0.5)
-        sad = result.get('moodSad', 0.5)
-        party = result.get('moodParty', 0.5)
+        happy = final_moods.get('moodHappy', 0.5)
+        sad = final_moods.get('moodSad', 0.5)
+        party = final_moods.get('moodParty', 0.5)
         result['valence'] = round(max(0.0, min(1.0, happy * 0.5 + party * 0.3 + (1 - sad) * 0.2)), 3)
         
         # === AROUSAL (derived from mood models) ===
         # Arousal = energy level: aggressive/party/electronic vs relaxed/acoustic
-        aggressive = result.get('moodAggressive', 0.5)
-        relaxed = result.get('moodRelaxed', 0.5)
-        acoustic = result.get('moodAcoustic', 0.5)
-        electronic = result.get('moodElectronic', 0.5)
+        aggressive = final_moods.get('moodAggressive', 0.5)
+        relaxed = final_moods.get('moodRelaxed', 0.5)
+        acoustic = final_moods.get('moodAcoustic', 0.5)
+        electronic = final_moods.get('moodElectronic', 0.5)
         result['arousal'] = round(max(0.0, min(1.0, aggressive * 0.35 + party * 0.25 + electronic * 0.2 + (1 - relaxed) * 0.1 + (1 - acoustic) * 0.1)), 3)
         
         # === INSTRUMENTALNESS & SPEECHINESS (voice/instrumental) ===
-        if 'voice_instrumental' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['voice_instrumental'], embeddings, 'voice_instrumental')
+        if 'voice_instrumental' in head_preds:
+            val, var = head_preds['voice_instrumental']
             result['instrumentalness'] = val
             # Derive speechiness: inverse of instrumentalness, scaled down
             result['speechiness'] = round(max(0.0, min(1.0, (1.0 - val) * 0.6)), 3)
@@ -807,8 +932,8 @@ class AudioAnalyzer:
             result['acousticness'] = result['moodAcoustic']
 
         # === ML DANCEABILITY ===
-        if 'danceability' in self.prediction_models:
-            val, var = safe_predict(self.prediction_models['danceability'], embeddings, 'danceability')
+        if 'danceability' in head_preds:
+            val, var = head_preds['danceability']
             result['danceabilityMl'] = val
 
         return result
@@ -925,7 +1050,8 @@ class AudioAnalyzer:
         In Enhanced mode, uses ML predictions for more accurate tagging.
         In Standard mode, uses heuristic rules.
         """
-        tags = []
+        # Insertion-ordered set: dedupes while keeping rule order for the cap
+        tags: Dict[str, None] = {}
         
         bpm = features.get('bpm', 0) or 0
         energy = features.get('energy', 0.5) or 0.5
@@ -942,82 +1068,201 @@ class AudioAnalyzer:
         
         # ML-based tags (higher confidence)
         if mood_happy is not None and mood_happy >= 0.6:
-            tags.append('happy')
-            tags.append('uplifting')
+            tags['happy'] = None
+            tags['uplifting'] = None
         if mood_sad is not None and mood_sad >= 0.6:
-            tags.append('sad')
-            tags.append('melancholic')
+            tags['sad'] = None
+            tags['melancholic'] = None
         if mood_relaxed is not None and mood_relaxed >= 0.6:
-            tags.append('relaxed')
-            tags.append('chill')
+            tags['relaxed'] = None
+            tags['chill'] = None
         if mood_aggressive is not None and mood_aggressive >= 0.6:
-            tags.append('aggressive')
-            tags.append('intense')
+            tags['aggressive'] = None
+            tags['intense'] = None
         
         # Arousal-based tags (prefer ML arousal)
         if arousal >= 0.7:
-            tags.append('energetic')
-            tags.append('upbeat')
+            tags['energetic'] = None
+            tags['upbeat'] = None
         elif arousal <= 0.3:
-            tags.append('calm')
-            tags.append('peaceful')
+            tags['calm'] = None
+            tags['peaceful'] = None
         
         # Valence-based tags (if not already added by ML)
         if 'happy' not in tags and 'sad' not in tags:
             if valence >= 0.7:
-                tags.append('happy')
-                tags.append('uplifting')
+                tags['happy'] = None
+                tags['uplifting'] = None
             elif valence <= 0.3:
-                tags.append('sad')
-                tags.append('melancholic')
+                tags['sad'] = None
+                tags['melancholic'] = None
         
         # Danceability-based tags
         if danceability >= 0.7:
-            tags.append('dance')
-            tags.append('groovy')
+            tags['dance'] = None
+            tags['groovy'] = None
         
         # BPM-based tags
         if bpm >= 140:
-            tags.append('fast')
+            tags['fast'] = None
         elif bpm <= 80:
-            tags.append('slow')
+            tags['slow'] = None
         
         # Key-based tags
         if key_scale == 'minor':
             if 'happy' not in tags:
-                tags.append('moody')
+                tags['moody'] = None
         
         # Combination tags
         if arousal >= 0.7 and bpm >= 120:
-            tags.append('workout')
+            tags['workout'] = None
         if arousal <= 0.4 and valence <= 0.4:
-            tags.append('atmospheric')
+            tags['atmospheric'] = None
         if arousal <= 0.3 and bpm <= 90:
-            tags.append('chill')
+            tags['chill'] = None
         if mood_aggressive is not None and mood_aggressive >= 0.5 and bpm >= 120:
-            tags.append('intense')
+            tags['intense'] = None
         
-        return list(set(tags))[:12]  # Dedupe and limit
+        return list(tags)[:12]  # Limit (already deduped)
 
 
 # Global analyzer instance for worker processes (initialized per-process)
 _process_analyzer = None
 
+def _write_cache_file(path: str, data: bytes):
+    """Write a cache entry via temp file + rename so readers never see partial data."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write cache entry {path}: {e}")
+
+def _analysis_cache_path(full_path: str, size: int, enhanced: bool) -> Optional[str]:
+    """
+    Cache entry for a file's analysis result.
+
+    Keyed by a content fingerprint (size plus the first and last MiB), so moved
+    or re-scanned files still hit, and by the settings that shape the result.
+    """
+    if not ANALYSIS_CACHE_DIR:
+        return None
+    chunk = 1 << 20
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(full_path, 'rb') as f:
+            digest.update(f.read(chunk))
+            if size > chunk:
+                f.seek(max(chunk, size - chunk))
+                digest.update(f.read(chunk))
+    except OSError:
+        return None
+    digest.update(f"{size}:{ESSENTIA_VERSION}:{MAX_ANALYZE_SECONDS}:{enhanced}".encode())
+    return os.path.join(ANALYSIS_CACHE_DIR, f"{digest.hexdigest()}.json")
+
+def _read_cached_analysis(path: str) -> Optional[Dict[str, Any]]:
+    """Load a cached analysis result, or None if missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            features = json.load(f)
+        os.utime(path)  # Mark as recently used for LRU pruning
+        return features
+    except (OSError, ValueError):
+        return None
+
+def _prune_analysis_cache():
+    """Evict least-recently-used cache entries beyond ANALYSIS_CACHE_MAX_MB."""
+    if not ANALYSIS_CACHE_DIR:
+        return
+    try:
+        entries = []
+        for entry in os.scandir(ANALYSIS_CACHE_DIR):
+            if entry.name.endswith(('.json', '.npy')):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return
+
+    total_bytes = sum(size for _, size, _ in entries)
+    limit_bytes = ANALYSIS_CACHE_MAX_MB * 1024 * 1024
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total_bytes <= limit_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_bytes -= size
+        removed += 1
+    if removed:
+        logger.info(f"Pruned {removed} analysis cache entries (cache limit {ANALYSIS_CACHE_MAX_MB}MB)")
+
+def _encode_job(track_id: str, file_path: str):
+    """Encode an analysis queue payload (bytes with orjson, str otherwise)."""
+    job = {'trackId': track_id, 'filePath': file_path}
+    if orjson is not None:
+        return orjson.dumps(job)
+    return json.dumps(job)
+
+def _decode_job(data) -> Tuple[str, str]:
+    """Decode an analysis queue payload into (track_id, file_path)."""
+    job = orjson.loads(data) if orjson is not None else json.loads(data)
+    return (job['trackId'], job.get('filePath', ''))
+
+def _decode_jobs(payloads) -> List[Tuple[str, str]]:
+    """Decode popped queue payloads, logging and skipping malformed entries."""
+    jobs = []
+    for data in payloads:
+        try:
+            jobs.append(_decode_job(data))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping malformed analysis job {data!r}: {e!r}")
+    return jobs
+
 def _pool_health_check():
     """No-op function for pool health checks (lambdas can't be pickled with spawn mode)."""
     return True
 
-def _init_worker_process():
+def _get_analyzer() -> AudioAnalyzer:
+    """Return this process's analyzer, creating it on first use."""
+    global _process_analyzer
+    if _process_analyzer is None:
+        _process_analyzer = AudioAnalyzer()
+    return _process_analyzer
+
+def _init_worker_process(num_workers: int):
     """
     Initialize the analyzer for a worker process.
     
+    Runs once per spawned worker so the Essentia extractors and MusiCNN
+    graphs are loaded at startup and reused for every track it analyzes.
     If model loading fails, the analyzer will fall back to Standard mode.
     This prevents worker crashes from breaking the entire process pool.
     """
-    global _process_analyzer
+    global THREADS_PER_WORKER
+    # Cap threads for the pool this worker belongs to, before the models load
+    THREADS_PER_WORKER = configure_thread_env(
+        REQUESTED_THREADS_PER_WORKER,
+        configure_tensorflow=True,
+        workers=num_workers,
+    )
+    if SCIPY_AVAILABLE:
+        _RFFT_KWARGS['workers'] = THREADS_PER_WORKER
+
+    # The thread env vars only bind if set before a native pool starts; cap
+    # any BLAS/OpenMP pool that initialized anyway so workers don't oversubscribe.
     try:
-        _process_analyzer = AudioAnalyzer()
-        mode = "Enhanced" if _process_analyzer.enhanced_mode else "Standard"
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=THREADS_PER_WORKER)
+    except ImportError:
+        pass
+
+    try:
+        analyzer = _get_analyzer()
+        mode = "Enhanced" if analyzer.enhanced_mode else "Standard"
         logger.info(f"Worker process {os.getpid()} initialized with analyzer ({mode} mode)")
     except Exception as e:
         logger.error(f"Worker initialization error: {e}")
@@ -1031,7 +1276,6 @@ def _analyze_track_in_process(args: Tuple[str, str]) -> Tuple[str, str, Dict[str
     Analyze a single track in a worker process.
     Returns (track_id, file_path, features_dict or error_dict)
     """
-    global _process_analyzer
     track_id, file_path = args
     
     try:
@@ -1043,17 +1287,20 @@ def _analyze_track_in_process(args: Tuple[str, str]) -> Tuple[str, str, Dict[str
         normalized_path = file_path.replace('\\', '/')
         full_path = os.path.join(MUSIC_PATH, normalized_path)
         
-        # Use os.fsencode/fsdecode for filesystem-safe encoding
+        # Reject paths the filesystem encoding can't represent (same check as
+        # os.fsencode, without building a decoded copy of the path)
         try:
-            full_path = os.fsdecode(os.fsencode(full_path))
+            full_path.encode(sys.getfilesystemencoding(), sys.getfilesystemencodeerrors())
         except (UnicodeError, AttributeError):
             return (track_id, file_path, {'_error': 'Invalid characters in file path'})
         
-        if not os.path.exists(full_path):
+        # One stat serves the existence check, the size limit and the cache key
+        try:
+            file_size_bytes = os.stat(full_path).st_size
+        except OSError:
             return (track_id, file_path, {'_error': 'File not found'})
 
         if MAX_FILE_SIZE_MB > 0:
-            file_size_bytes = os.path.getsize(full_path)
             file_size_mb = file_size_bytes / (1024 * 1024)
             if file_size_mb > MAX_FILE_SIZE_MB:
                 return (
@@ -1065,8 +1312,20 @@ def _analyze_track_in_process(args: Tuple[str, str]) -> Tuple[str, str, Dict[str
                     },
                 )
 
+        # Reuse a cached result for identical file content
+        analyzer = _get_analyzer()
+        cache_path = _analysis_cache_path(full_path, file_size_bytes, analyzer.enhanced_mode)
+        if cache_path:
+            cached = _read_cached_analysis(cache_path)
+            if cached is not None:
+                logger.info(f"Using cached analysis for track {track_id}")
+                return (track_id, file_path, cached)
+
         # Run analysis
-        features = _process_analyzer.analyze(full_path)
+        features = analyzer.analyze(full_path)
+        # Only cache completed analyses (load failures return an empty result)
+        if cache_path and not features.get('_error') and features.get('bpm') is not None:
+            _write_cache_file(cache_path, json.dumps(features).encode('utf-8'))
         return (track_id, file_path, features)
         
     except UnicodeDecodeError as e:
@@ -1080,7 +1339,8 @@ def _analyze_track_in_process(args: Tuple[str, str]) -> Tuple[str, str, Dict[str
 class AnalysisWorker:
     """Worker that processes audio analysis jobs from Redis queue using parallel processing"""
     
-    IDLE_SHUTDOWN_CYCLES = 10  # Shut down pool after this many empty cycles (~50s at 5s interval)
+    IDLE_MAINTENANCE_SECONDS = 300  # Stale/failed/cache maintenance cadence while idle
+    HEARTBEAT_INTERVAL_SECONDS = 30  # Backend treats a heartbeat as live for 5 minutes
 
     def __init__(self):
         """Initialize Redis/DB clients and runtime state for batch processing."""
@@ -1090,16 +1350,28 @@ class AnalysisWorker:
         self.executor = None
         self.pool_active = False
         self.consecutive_empty = 0
+        self._next_maintenance_at = time.monotonic() + self.IDLE_MAINTENANCE_SECONDS
+        self._next_heartbeat_at = 0.0
         self.is_paused = False  # Enrichment control: pause state
         self.pubsub = None  # Redis pub/sub for control signals
         self._last_work_time = time.time()
         self._pending_resize: int | None = None
-        self._pending_resize_time: float = 0.0
+        self._pending_resize_due: float = 0.0
         self.batch_count = 0
         self._reconcile_interval_seconds = float(DB_RECONCILE_MIN_INTERVAL_SECONDS)
         self._next_reconcile_at = 0.0
+        self._use_blmpop = self._supports_blmpop()
         self._setup_control_channel()
     
+    def _supports_blmpop(self) -> bool:
+        """Whether the Redis server has BLMPOP (Redis 7+) for one-call batch dequeue."""
+        try:
+            version = str(self.redis.info('server').get('redis_version', '0'))
+            return int(version.split('.')[0]) >= 7
+        except Exception as e:
+            logger.warning(f"Could not detect Redis version, using BRPOP dequeue: {e}")
+            return False
+
     def _setup_control_channel(self):
         """Subscribe to control channel for pause/resume/stop signals"""
         try:
@@ -1145,8 +1417,13 @@ class AnalysisWorker:
             return
         
         try:
-            message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=0.001)
-            if message and message['type'] == 'message':
+            # Drain everything already queued without blocking
+            while True:
+                message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=0)
+                if not message:
+                    break
+                if message['type'] != 'message':
+                    continue
                 data = message['data'].decode('utf-8') if isinstance(message['data'], bytes) else message['data']
                 
                 # Try to parse as JSON for structured commands
@@ -1157,9 +1434,10 @@ class AnalysisWorker:
                         new_count = max(1, min(8, new_count))
                         if new_count != NUM_WORKERS:
                             self._pending_resize = new_count
-                            self._pending_resize_time = time.time()
+                            # Each new signal pushes the deadline out (debounce)
+                            self._pending_resize_due = time.monotonic() + RESIZE_DEBOUNCE_SECONDS
                             logger.info(f"Worker resize queued: {NUM_WORKERS} -> {new_count} (applying in {RESIZE_DEBOUNCE_SECONDS}s)")
-                        return
+                        continue
                 except (json.JSONDecodeError, ValueError):
                     pass  # Not JSON, try as plain string
                 
@@ -1179,11 +1457,12 @@ class AnalysisWorker:
             logger.warning(f"Error checking control signals: {e}")
     
     def _apply_pending_resize(self):
-        """Apply buffered resize if debounce period has elapsed."""
-        if self._pending_resize is None:
-            return
-        elapsed = time.time() - self._pending_resize_time
-        if elapsed < RESIZE_DEBOUNCE_SECONDS:
+        """Apply buffered resize once its debounce deadline has passed.
+
+        Runs on the main loop (not a timer thread) so the pool is never
+        swapped out from under an in-flight batch.
+        """
+        if self._pending_resize is None or time.monotonic() < self._pending_resize_due:
             return
         target = self._pending_resize
         self._pending_resize = None
@@ -1205,19 +1484,25 @@ class AnalysisWorker:
         old_executor = self.executor
         NUM_WORKERS = new_count
         
-        # Create new pool first
+        # Pool is started lazily; the next _ensure_pool picks up the new count
+        if not self.pool_active or old_executor is None:
+            logger.info(f"Worker count set to {NUM_WORKERS} (pool starts on next job)")
+            return
+        
+        # Gracefully shutdown old pool first (wait for in-flight work) so its
+        # workers' models are released before replacements load theirs
+        logger.info("Draining current worker pool before resize...")
+        try:
+            old_executor.shutdown(wait=True)
+        except Exception as e:
+            logger.warning(f"Error shutting down old pool: {e}")
+        
         self.executor = ProcessPoolExecutor(
             max_workers=NUM_WORKERS,
-            initializer=_init_worker_process
+            initializer=_init_worker_process,
+            initargs=(NUM_WORKERS,),
         )
         
-        # Gracefully shutdown old pool (wait for in-flight work)
-        if old_executor:
-            try:
-                old_executor.shutdown(wait=True)
-            except Exception as e:
-                logger.warning(f"Error shutting down old pool: {e}")
-        
         logger.info(f"Worker pool resized to {NUM_WORKERS} workers")
     
     def _check_pool_health(self) -> bool:
@@ -1232,7 +1517,16 @@ class AnalysisWorker:
         if hasattr(self.executor, '_broken') and self.executor._broken:
             return False
         
-        # Try a no-op submission to verify pool works
+        # Inspect worker processes directly; no IPC round-trip needed.
+        # An empty map just means no worker has been spawned yet.
+        processes = getattr(self.executor, '_processes', None)
+        if processes is not None:
+            if not processes:
+                return True
+            return any(p.is_alive() for p in list(processes.values()))
+        
+        # Fallback when the executor doesn't expose its processes:
+        # a no-op submission verifies the pool works
         try:
             future = self.executor.submit(_pool_health_check)
             result = future.result(timeout=5)
@@ -1253,7 +1547,8 @@ class AnalysisWorker:
         logger.info(f"Starting worker pool with {NUM_WORKERS} processes...")
         self.executor = ProcessPoolExecutor(
             max_workers=NUM_WORKERS,
-            initializer=_init_worker_process
+            initializer=_init_worker_process,
+            initargs=(NUM_WORKERS,),
         )
         self.pool_active = True
         logger.info(f"Worker pool started ({NUM_WORKERS} workers)")
@@ -1341,7 +1636,7 @@ class AnalysisWorker:
                 """,
                 (reason[:500], track_ids),
             )
-            eligible_ids = {row["id"] for row in cursor.fetchall()}
+            eligible_ids = {row[0] for row in cursor.fetchall()}
             self.db.commit()
         except Exception as e:
             logger.error(f"Failed to reset tracks to pending after pool crash: {e}")
@@ -1353,22 +1648,18 @@ class AnalysisWorker:
         if not eligible_ids:
             return
 
-        pipe = self.redis.pipeline()
-        queued_count = 0
-        for track_id, file_path in tracks:
-            if track_id not in eligible_ids:
-                continue
-            pipe.rpush(
-                ANALYSIS_QUEUE,
-                json.dumps({"trackId": track_id, "filePath": file_path}),
-            )
-            queued_count += 1
+        payloads = [
+            _encode_job(track_id, file_path)
+            for track_id, file_path in tracks
+            if track_id in eligible_ids
+        ]
 
-        if queued_count > 0:
+        if payloads:
             try:
-                pipe.execute()
+                # One variadic RPUSH instead of a command per track
+                self.redis.rpush(ANALYSIS_QUEUE, *payloads)
                 logger.warning(
-                    f"Re-queued {queued_count} track(s) after process pool crash: {reason}"
+                    f"Re-queued {len(payloads)} track(s) after process pool crash: {reason}"
                 )
             except Exception as e:
                 logger.error(f"Failed to push re-queued tracks back to Redis: {e}")
@@ -1379,31 +1670,47 @@ class AnalysisWorker:
         """
         cursor = self.db.get_cursor()
         try:
-            # First: recover tracks that have embeddings but are stuck in processing
+            # One pass over stale 'processing' tracks: those that already have an
+            # embedding are completed, the rest go back to pending (within retry budget).
+            # SKIP LOCKED leaves rows a live worker is still writing to alone.
             cursor.execute("""
+                WITH stale AS (
+                    SELECT
+                        t.id,
+                        EXISTS (
+                            SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id
+                        ) AS has_embedding,
+                        COALESCE(t."analysisRetryCount", 0) AS retry_count
+                    FROM "Track" t
+                    WHERE t."analysisStatus" = 'processing'
+                    AND COALESCE(t."analysisStartedAt", t."updatedAt") < NOW() - make_interval(mins => %s)
+                    AND (
+                        COALESCE(t."analysisRetryCount", 0) < %s
+                        OR EXISTS (SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id)
+                    )
+                    FOR UPDATE OF t SKIP LOCKED
+                )
                 UPDATE "Track" t
                 SET
-                    "analysisStatus" = 'completed',
-                    "analysisError" = NULL,
+                    "analysisStatus" = CASE WHEN s.has_embedding THEN 'completed' ELSE 'pending' END,
+                    "analysisError" = CASE WHEN s.has_embedding THEN NULL ELSE t."analysisError" END,
                     "analysisStartedAt" = NULL,
+                    "analysisRetryCount" = CASE
+                        WHEN s.has_embedding THEN t."analysisRetryCount"
+                        ELSE s.retry_count + 1
+                    END,
                     "updatedAt" = NOW()
-                FROM track_embeddings te
-                WHERE t.id = te.track_id
-                AND t."analysisStatus" = 'processing'
-                AND (
-                    (t."analysisStartedAt" IS NOT NULL AND t."analysisStartedAt" < NOW() - INTERVAL '%s minutes')
-                    OR
-                    (t."analysisStartedAt" IS NULL AND t."updatedAt" < NOW() - INTERVAL '%s minutes')
-                )
-                RETURNING t.id
-            """, (STALE_PROCESSING_MINUTES, STALE_PROCESSING_MINUTES))
+                FROM stale s
+                WHERE t.id = s.id
+                RETURNING t.id, s.has_embedding
+            """, (STALE_PROCESSING_MINUTES, MAX_RETRIES))
 
-            recovered_ids = cursor.fetchall()
-            recovered_count = len(recovered_ids)
+            rows = cursor.fetchall()
+            recovered_track_ids = [track_id for track_id, has_embedding in rows if has_embedding]
+            reset_count = len(rows) - len(recovered_track_ids)
 
-            if recovered_count > 0:
-                logger.info(f"Recovered {recovered_count} stale tracks that already had embeddings")
-                recovered_track_ids = [row['id'] for row in recovered_ids]
+            if recovered_track_ids:
+                logger.info(f"Recovered {len(recovered_track_ids)} stale tracks that already had embeddings")
                 cursor.execute("""
                     UPDATE "EnrichmentFailure"
                     SET
@@ -1414,28 +1721,6 @@ class AnalysisWorker:
                     AND resolved = false
                 """, (recovered_track_ids,))
 
-            # Then: reset truly stale tracks (no embedding) back to pending
-            cursor.execute("""
-                UPDATE "Track" t
-                SET
-                    "analysisStatus" = 'pending',
-                    "analysisStartedAt" = NULL,
-                    "analysisRetryCount" = COALESCE(t."analysisRetryCount", 0) + 1,
-                    "updatedAt" = NOW()
-                WHERE t."analysisStatus" = 'processing'
-                AND (
-                    (t."analysisStartedAt" IS NOT NULL AND t."analysisStartedAt" < NOW() - INTERVAL '%s minutes')
-                    OR
-                    (t."analysisStartedAt" IS NULL AND t."updatedAt" < NOW() - INTERVAL '%s minutes')
-                )
-                AND COALESCE(t."analysisRetryCount", 0) < %s
-                AND NOT EXISTS (SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id)
-                RETURNING t.id
-            """, (STALE_PROCESSING_MINUTES, STALE_PROCESSING_MINUTES, MAX_RETRIES))
-
-            reset_ids = cursor.fetchall()
-            reset_count = len(reset_ids)
-
             if reset_count > 0:
                 logger.info(f"Reset {reset_count} stale 'processing' tracks back to 'pending'")
 
@@ -1452,24 +1737,41 @@ class AnalysisWorker:
         """
         cursor = self.db.get_cursor()
         try:
-            # First: recover tracks marked failed that actually have embeddings
+            # One pass over 'failed' tracks: those that actually have an embedding
+            # are recovered as completed, the rest go back to pending (within retry
+            # budget). SKIP LOCKED leaves rows another worker is touching alone.
             cursor.execute("""
+                WITH failed AS (
+                    SELECT
+                        t.id,
+                        EXISTS (
+                            SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id
+                        ) AS has_embedding
+                    FROM "Track" t
+                    WHERE t."analysisStatus" = 'failed'
+                    AND (
+                        COALESCE(t."analysisRetryCount", 0) < %s
+                        OR EXISTS (SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id)
+                    )
+                    FOR UPDATE OF t SKIP LOCKED
+                )
                 UPDATE "Track" t
                 SET
-                    "analysisStatus" = 'completed',
+                    "analysisStatus" = CASE WHEN f.has_embedding THEN 'completed' ELSE 'pending' END,
                     "analysisError" = NULL,
-                    "analysisStartedAt" = NULL,
+                    "analysisStartedAt" = CASE WHEN f.has_embedding THEN NULL ELSE t."analysisStartedAt" END,
                     "updatedAt" = NOW()
-                FROM track_embeddings te
-                WHERE t.id = te.track_id
-                AND t."analysisStatus" = 'failed'
-                RETURNING t.id
-            """)
+                FROM failed f
+                WHERE t.id = f.id
+                RETURNING t.id, f.has_embedding
+            """, (MAX_RETRIES,))
+
+            rows = cursor.fetchall()
+            recovered_track_ids = [track_id for track_id, has_embedding in rows if has_embedding]
+            retry_count = len(rows) - len(recovered_track_ids)
 
-            recovered_ids = cursor.fetchall()
-            if len(recovered_ids) > 0:
-                logger.info(f"Recovered {len(recovered_ids)} 'failed' tracks that already had embeddings")
-                recovered_track_ids = [row['id'] for row in recovered_ids]
+            if recovered_track_ids:
+                logger.info(f"Recovered {len(recovered_track_ids)} 'failed' tracks that already had embeddings")
                 cursor.execute("""
                     UPDATE "EnrichmentFailure"
                     SET
@@ -1480,22 +1782,6 @@ class AnalysisWorker:
                     AND resolved = false
                 """, (recovered_track_ids,))
 
-            # Then: retry truly failed tracks (no embedding)
-            cursor.execute("""
-                UPDATE "Track" t
-                SET
-                    "analysisStatus" = 'pending',
-                    "analysisError" = NULL,
-                    "updatedAt" = NOW()
-                WHERE t."analysisStatus" = 'failed'
-                AND COALESCE(t."analysisRetryCount", 0) < %s
-                AND NOT EXISTS (SELECT 1 FROM track_embeddings te WHERE te.track_id = t.id)
-                RETURNING t.id
-            """, (MAX_RETRIES,))
-            
-            retry_ids = cursor.fetchall()
-            retry_count = len(retry_ids)
-            
             if retry_count > 0:
                 logger.info(f"Re-queued {retry_count} failed tracks for retry (max retries: {MAX_RETRIES})")
             
@@ -1508,8 +1794,8 @@ class AnalysisWorker:
             """, (MAX_RETRIES,))
             
             perm_failed = cursor.fetchone()
-            if perm_failed and perm_failed['count'] > 0:
-                logger.warning(f"{perm_failed['count']} tracks have permanently failed (exceeded {MAX_RETRIES} retries)")
+            if perm_failed and perm_failed[0] > 0:
+                logger.warning(f"{perm_failed[0]} tracks have permanently failed (exceeded {MAX_RETRIES} retries)")
             
             self.db.commit()
         except Exception as e:
@@ -1546,7 +1832,7 @@ class AnalysisWorker:
                 return False
 
             logger.info(f"DB reconciliation found {len(tracks)} pending tracks, queuing...")
-            track_ids = [t['id'] for t in tracks]
+            track_ids = [track_id for track_id, _ in tracks]
             cursor.execute("""
                 UPDATE "Track"
                 SET "analysisStatus" = 'processing',
@@ -1556,19 +1842,15 @@ class AnalysisWorker:
                 AND "analysisStatus" = 'pending'
                 RETURNING id
             """, (track_ids,))
-            marked_ids = {row['id'] for row in cursor.fetchall()}
+            marked_ids = {row[0] for row in cursor.fetchall()}
             self.db.commit()
             if not marked_ids:
                 return False
-            pipe = self.redis.pipeline()
-            for t in tracks:
-                if t['id'] not in marked_ids:
-                    continue
-                pipe.rpush(ANALYSIS_QUEUE, json.dumps({
-                    'trackId': t['id'],
-                    'filePath': t['filePath']
-                }))
-            pipe.execute()
+            self.redis.rpush(ANALYSIS_QUEUE, *[
+                _encode_job(track_id, file_path)
+                for track_id, file_path in tracks
+                if track_id in marked_ids
+            ])
             return True
         except Exception as e:
             logger.error(f"DB reconciliation failed: {e}")
@@ -1589,11 +1871,13 @@ class AnalysisWorker:
         logger.info(f"  CPU cores: {cpu_count}")
         logger.info(f"  Worker processes: {NUM_WORKERS}")
         logger.info(f"  BRPOP timeout: {BRPOP_TIMEOUT}s")
+        logger.info(f"  Dequeue: {'BLMPOP (batched)' if self._use_blmpop else 'BRPOP + LRANGE/LTRIM'}")
         logger.info(f"  Model idle timeout: {MODEL_IDLE_TIMEOUT}s")
         logger.info(f"  Max retries per track: {MAX_RETRIES}")
         logger.info(f"  Stale processing timeout: {STALE_PROCESSING_MINUTES} minutes")
         logger.info(f"  Max file size: {MAX_FILE_SIZE_MB}MB" + (" (disabled)" if MAX_FILE_SIZE_MB == 0 else ""))
         logger.info(f"  Batch timeout: {BATCH_ANALYSIS_TIMEOUT_SECONDS}s")
+        logger.info(f"  Analysis cache: {ANALYSIS_CACHE_DIR or 'disabled'}")
         logger.info(f"  Essentia available: {ESSENTIA_AVAILABLE}")
         logger.info(f"  ML models on disk: {TF_MODELS_AVAILABLE}")
         logger.info(f"  Worker pool: LAZY (starts on first job)")
@@ -1613,11 +1897,14 @@ class AnalysisWorker:
         try:
             while self.running:
                 try:
-                    # Publish heartbeat
-                    try:
-                        self.redis.set("audio:worker:heartbeat", str(int(time.time() * 1000)))
-                    except Exception:
-                        pass
+                    # Publish heartbeat (throttled: one SET per interval, not per wake-up)
+                    now = time.monotonic()
+                    if now >= self._next_heartbeat_at:
+                        try:
+                            self.redis.set("audio:worker:heartbeat", str(int(time.time() * 1000)))
+                            self._next_heartbeat_at = now + self.HEARTBEAT_INTERVAL_SECONDS
+                        except Exception:
+                            pass
 
                     # Check for control signals (pause/resume/stop/set_workers)
                     self._check_control_signals()
@@ -1630,9 +1917,10 @@ class AnalysisWorker:
 
                     # BRPOP-driven: blocks until work arrives or timeout
                     has_work = self.process_batch_parallel()
+                    # A clean pass (work or timeout) resets the error-recovery counter
+                    self.consecutive_empty = 0
 
                     if has_work:
-                        self.consecutive_empty = 0
                         self._last_work_time = time.time()
                         self.batch_count += 1
                         self._schedule_next_reconciliation(True)
@@ -1642,26 +1930,24 @@ class AnalysisWorker:
                             self._retry_failed_tracks()
                     else:
                         # BRPOP timed out -- run periodic maintenance
-                        self.consecutive_empty += 1
                         found_work = self._run_db_reconciliation_if_due()
 
-                        # Unload models when idle: immediately if DB has no pending
-                        # work, or after MODEL_IDLE_TIMEOUT as a fallback
+                        # Unload models once idle for MODEL_IDLE_TIMEOUT; reconciliation
+                        # only holds the pool up while the DB still has pending work
                         if self.pool_active and not found_work:
                             idle_seconds = time.time() - self._last_work_time
                             if idle_seconds >= MODEL_IDLE_TIMEOUT:
                                 self._shutdown_pool()
                                 logger.info(f"Models idle for {idle_seconds:.0f}s, pool shut down")
-                            elif idle_seconds >= BRPOP_TIMEOUT:
-                                # No pending work in DB and queue empty -- unload now
-                                self._shutdown_pool()
-                                logger.info("All work complete, pool shut down (will restart when work arrives)")
 
-                        # Periodic cleanup every IDLE_SHUTDOWN_CYCLES timeouts
-                        if self.consecutive_empty >= self.IDLE_SHUTDOWN_CYCLES:
+                        # Periodic cleanup on a wall-time cadence, independent of
+                        # how long each BRPOP blocks
+                        now = time.monotonic()
+                        if now >= self._next_maintenance_at:
                             self._cleanup_stale_processing()
                             self._retry_failed_tracks()
-                            self.consecutive_empty = 0
+                            _prune_analysis_cache()
+                            self._next_maintenance_at = now + self.IDLE_MAINTENANCE_SECONDS
 
                 except KeyboardInterrupt:
                     logger.info("Shutdown requested")
@@ -1702,27 +1988,40 @@ class AnalysisWorker:
     def process_batch_parallel(self) -> bool:
         """Process a batch of pending tracks in parallel.
 
-        Uses BRPOP to wait for the first job (blocking, zero CPU),
-        then drains remaining queued jobs up to BATCH_SIZE.
+        On Redis 7+ a single BLMPOP waits for work and pops up to
+        BATCH_SIZE jobs. Otherwise uses BLPOP to wait for the first job
+        (blocking, zero CPU), then drains remaining queued jobs up to
+        BATCH_SIZE in one atomic LRANGE+LTRIM round-trip. Producers RPUSH,
+        so both paths take the oldest jobs from the head of the list.
 
         Returns:
-            True if there was work to process, False if BRPOP timed out
+            True if there was work to process, False if the wait timed out
         """
-        result = self.redis.brpop(ANALYSIS_QUEUE, timeout=BRPOP_TIMEOUT)
+        if self._use_blmpop:
+            result = self.redis.execute_command(
+                'BLMPOP', BRPOP_TIMEOUT, 1, ANALYSIS_QUEUE, 'LEFT', 'COUNT', BATCH_SIZE
+            )
+            if not result:
+                return False
+            _, jobs_data = result
+            queued_jobs = _decode_jobs(jobs_data)
+            self._process_tracks_parallel(queued_jobs)
+            return True
+
+        result = self.redis.blpop(ANALYSIS_QUEUE, timeout=BRPOP_TIMEOUT)
 
         if result is None:
             return False
 
         _, first_job_data = result
-        first_job = json.loads(first_job_data)
-        queued_jobs = [(first_job['trackId'], first_job.get('filePath', ''))]
+        queued_jobs = _decode_jobs([first_job_data])
 
-        while len(queued_jobs) < BATCH_SIZE:
-            job_data = self.redis.lpop(ANALYSIS_QUEUE)
-            if not job_data:
-                break
-            job = json.loads(job_data)
-            queued_jobs.append((job['trackId'], job.get('filePath', '')))
+        if BATCH_SIZE > 1:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.lrange(ANALYSIS_QUEUE, 0, BATCH_SIZE - 2)
+            pipe.ltrim(ANALYSIS_QUEUE, BATCH_SIZE - 1, -1)
+            drained, _ = pipe.execute()
+            queued_jobs.extend(_decode_jobs(drained))
 
         self._process_tracks_parallel(queued_jobs)
         return True
@@ -1740,23 +2039,36 @@ class AnalysisWorker:
         # and 'processing' rows here so freshly queued work is not dropped.
         cursor = self.db.get_cursor()
         try:
+            # The DB row is the source of truth: the stored filePath wins over
+            # whatever the queue entry carried. The jobs are already off the
+            # queue, so wait on rows another writer holds rather than skip them
             track_ids = [t[0] for t in tracks]
             cursor.execute("""
-                UPDATE "Track"
+                WITH claimed AS (
+                    SELECT id FROM "Track"
+                    WHERE id = ANY(%s)
+                    AND "analysisStatus" IN ('pending', 'processing')
+                    FOR UPDATE
+                )
+                UPDATE "Track" t
                 SET "analysisStatus" = 'processing',
-                    "analysisStartedAt" = COALESCE("analysisStartedAt", NOW()),
+                    "analysisStartedAt" = COALESCE(t."analysisStartedAt", NOW()),
                     "updatedAt" = NOW()
-                WHERE id = ANY(%s)
-                AND "analysisStatus" IN ('pending', 'processing')
-                RETURNING id
+                FROM claimed c
+                WHERE t.id = c.id
+                RETURNING t.id, t."filePath"
             """, (track_ids,))
-            valid_ids = {row['id'] for row in cursor.fetchall()}
+            claimed_paths = dict(cursor.fetchall())
             self.db.commit()
 
-            if len(valid_ids) < len(tracks):
-                skipped_non_pending = len(tracks) - len(valid_ids)
+            if len(claimed_paths) < len(tracks):
+                skipped_non_pending = len(tracks) - len(claimed_paths)
                 logger.info(f"Skipped {skipped_non_pending} stale queue entries (non-pending status)")
-                tracks = [track for track in tracks if track[0] in valid_ids]
+            tracks = [
+                (track_id, claimed_paths[track_id] or file_path)
+                for track_id, file_path in tracks
+                if track_id in claimed_paths
+            ]
 
             if not tracks:
                 logger.info("No pending tracks left in batch after status guard")
@@ -1774,70 +2086,100 @@ class AnalysisWorker:
         failed = 0
         permanent_failed = 0
         finalized_track_ids = set()
+        # Outcomes are buffered and flushed in small groups as futures finish,
+        # so a crash or a bad row only costs the unflushed group
+        pending_results: List[Tuple[str, Dict[str, Any]]] = []
+        pending_failures: List[Tuple[str, str, bool]] = []
+        flush_due_at: Optional[float] = None
         
         futures = {self.executor.submit(_analyze_track_in_process, t): t for t in tracks}
 
-        try:
-            for future in as_completed(futures, timeout=BATCH_ANALYSIS_TIMEOUT_SECONDS):
-                try:
-                    track_id, file_path, features = future.result()
+        # Wait on the remaining futures against one deadline; anything that has
+        # finished by then is still collected, only the rest time out
+        deadline = time.monotonic() + BATCH_ANALYSIS_TIMEOUT_SECONDS
+        not_done = set(futures)
 
-                    if features.get('_error'):
-                        is_permanent = bool(features.get('_permanent'))
-                        self._save_failed(track_id, features['_error'], permanent=is_permanent)
-                        finalized_track_ids.add(track_id)
+        try:
+            while not_done:
+                wait_until = deadline if flush_due_at is None else min(deadline, flush_due_at)
+                done, not_done = wait(
+                    not_done,
+                    timeout=max(0.0, wait_until - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done and time.monotonic() >= deadline:
+                    break
+                for future in done:
+                    try:
+                        track_id, file_path, features = future.result()
+
+                        if features.get('_error'):
+                            is_permanent = bool(features.get('_permanent'))
+                            pending_failures.append((track_id, features['_error'], is_permanent))
+                            finalized_track_ids.add(track_id)
+                            if is_permanent:
+                                permanent_failed += 1
+                                logger.warning(f"⊘ Permanently failed: {file_path} - {features['_error']}")
+                            else:
+                                failed += 1
+                                logger.error(f"✗ Failed: {file_path} - {features['_error']}")
+                        else:
+                            pending_results.append((track_id, features))
+                            finalized_track_ids.add(track_id)
+                            completed += 1
+                            logger.info(f"✓ Completed: {file_path}")
+                    except Exception as e:
+                        if self._is_pool_crash_error(e):
+                            logger.error(f"Process pool worker crash detected: {e}")
+                            for other_future in futures:
+                                if not other_future.done():
+                                    other_future.cancel()
+                            remaining_tracks = [
+                                track for track in tracks if track[0] not in finalized_track_ids
+                            ]
+                            self._requeue_tracks_for_retry(
+                                remaining_tracks,
+                                "Analyzer worker process crashed; re-queued for retry",
+                            )
+                            raise BrokenProcessPool(str(e))
+
+                        track_info = futures[future]
+                        error_message = f"Timeout or error: {e}"
+                        is_permanent = "memoryerror" in str(e).lower()
+                        pending_failures.append((track_info[0], error_message, is_permanent))
+                        finalized_track_ids.add(track_info[0])
                         if is_permanent:
                             permanent_failed += 1
-                            logger.warning(f"⊘ Permanently failed: {file_path} - {features['_error']}")
+                            logger.warning(f"⊘ Permanently failed: {track_info[1]} - {e}")
                         else:
                             failed += 1
-                            logger.error(f"✗ Failed: {file_path} - {features['_error']}")
-                    else:
-                        self._save_results(track_id, file_path, features)
-                        finalized_track_ids.add(track_id)
-                        completed += 1
-                        logger.info(f"✓ Completed: {file_path}")
-                except Exception as e:
-                    if self._is_pool_crash_error(e):
-                        logger.error(f"Process pool worker crash detected: {e}")
-                        for other_future in futures:
-                            if not other_future.done():
-                                other_future.cancel()
-                        remaining_tracks = [
-                            track for track in tracks if track[0] not in finalized_track_ids
-                        ]
-                        self._requeue_tracks_for_retry(
-                            remaining_tracks,
-                            "Analyzer worker process crashed; re-queued for retry",
-                        )
-                        raise BrokenProcessPool(str(e))
-
-                    track_info = futures[future]
-                    error_message = f"Timeout or error: {e}"
-                    is_permanent = "memoryerror" in str(e).lower()
-                    self._save_failed(track_info[0], error_message, permanent=is_permanent)
-                    finalized_track_ids.add(track_info[0])
-                    if is_permanent:
-                        permanent_failed += 1
-                        logger.warning(f"⊘ Permanently failed: {track_info[1]} - {e}")
-                    else:
-                        failed += 1
-                        logger.error(f"✗ Failed: {track_info[1]} - {e}")
-        except FuturesTimeoutError:
-            logger.error(
-                f"Batch timed out after {BATCH_ANALYSIS_TIMEOUT_SECONDS}s - failing unfinished tracks permanently"
-            )
-            for future, track_info in futures.items():
-                if future.done():
-                    continue
+                            logger.error(f"✗ Failed: {track_info[1]} - {e}")
+
+                buffered = len(pending_results) + len(pending_failures)
+                if buffered and flush_due_at is None:
+                    flush_due_at = time.monotonic() + RESULT_FLUSH_SECONDS
+                if buffered >= RESULT_FLUSH_SIZE or (
+                    flush_due_at is not None and time.monotonic() >= flush_due_at
+                ):
+                    self._flush_outcomes(pending_results, pending_failures)
+                    flush_due_at = None
+
+            if not_done:
+                logger.error(
+                    f"Batch timed out after {BATCH_ANALYSIS_TIMEOUT_SECONDS}s - failing unfinished tracks permanently"
+                )
+            for future in not_done:
+                track_info = futures[future]
                 future.cancel()
-                self._save_failed(
-                    track_info[0],
-                    f"Batch timeout after {BATCH_ANALYSIS_TIMEOUT_SECONDS}s",
-                    permanent=True,
+                pending_failures.append(
+                    (track_info[0], f"Batch timeout after {BATCH_ANALYSIS_TIMEOUT_SECONDS}s", True)
                 )
                 permanent_failed += 1
                 logger.warning(f"⊘ Permanently failed (batch timeout): {track_info[1]}")
+        finally:
+            # Also runs when a pool crash propagates: finished tracks were left
+            # out of the re-queue, so their outcomes must still be saved
+            self._flush_outcomes(pending_results, pending_failures)
         
         elapsed = time.time() - start_time
         rate = len(tracks) / elapsed if elapsed > 0 else 0
@@ -1845,147 +2187,199 @@ class AnalysisWorker:
             f"Batch complete: {completed} succeeded, {failed} failed, {permanent_failed} permanently failed in {elapsed:.1f}s ({rate:.1f} tracks/sec)"
         )
     
-    def _save_results(self, track_id: str, file_path: str, features: Dict[str, Any]):
-        """Save analysis results to database and resolve stale audio failures."""
+    def _flush_outcomes(
+        self,
+        results: List[Tuple[str, Dict[str, Any]]],
+        failures: List[Tuple[str, str, bool]],
+    ):
+        """Save and clear the buffered results and failures."""
+        try:
+            failures.extend(self._save_results(results))
+        finally:
+            results.clear()
+            self._save_failed(failures)
+            failures.clear()
+
+    def _save_results(self, results: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, str, bool]]:
+        """Save a batch of analysis results and resolve stale audio failures.
+
+        Returns (track_id, error, permanent) failures for results whose
+        features could not be turned into a row, so the caller can record them.
+        """
+        if not results:
+            return []
+
+        analyzed_at = datetime.utcnow()
+        rows = []
+        malformed: List[Tuple[str, str, bool]] = []
+        for track_id, features in results:
+            try:
+                rows.append((
+                    track_id,
+                    features['bpm'],
+                    features['beatsCount'],
+                    features['key'],
+                    features['keyScale'],
+                    features['keyStrength'],
+                    features['energy'],
+                    features['loudness'],
+                    features['dynamicRange'],
+                    features['danceability'],
+                    features['valence'],
+                    features['arousal'],
+                    features['instrumentalness'],
+                    features['acousticness'],
+                    features['speechiness'],
+                    features['moodTags'],
+                    features['essentiaGenres'],
+                    features.get('moodHappy'),
+                    features.get('moodSad'),
+                    features.get('moodRelaxed'),
+                    features.get('moodAggressive'),
+                    features.get('moodParty'),
+                    features.get('moodAcoustic'),
+                    features.get('moodElectronic'),
+                    features.get('danceabilityMl'),
+                    features.get('analysisMode', 'standard'),
+                    analyzed_at,
+                ))
+            except (KeyError, TypeError, AttributeError) as e:
+                logger.error(f"Malformed analysis result for track {track_id}: {e!r}")
+                malformed.append((track_id, f"Malformed analysis result: {e!r}", False))
+        if not rows:
+            return malformed
+        track_ids = [row[0] for row in rows]
+
         cursor = self.db.get_cursor()
         try:
-            cursor.execute("""
-                UPDATE "Track"
+            # One statement for the whole group: execute_values otherwise
+            # splits into pages of 100 rows
+            execute_values(cursor, """
+                UPDATE "Track" AS t
                 SET
-                    bpm = %s,
-                    "beatsCount" = %s,
-                    key = %s,
-                    "keyScale" = %s,
-                    "keyStrength" = %s,
-                    energy = %s,
-                    loudness = %s,
-                    "dynamicRange" = %s,
-                    danceability = %s,
-                    valence = %s,
-                    arousal = %s,
-                    instrumentalness = %s,
-                    acousticness = %s,
-                    speechiness = %s,
-                    "moodTags" = %s,
-                    "essentiaGenres" = %s,
-                    "moodHappy" = %s,
-                    "moodSad" = %s,
-                    "moodRelaxed" = %s,
-                    "moodAggressive" = %s,
-                    "moodParty" = %s,
-                    "moodAcoustic" = %s,
-                    "moodElectronic" = %s,
-                    "danceabilityMl" = %s,
-                    "analysisMode" = %s,
+                    bpm = v.bpm,
+                    "beatsCount" = v.beats_count,
+                    key = v.key,
+                    "keyScale" = v.key_scale,
+                    "keyStrength" = v.key_strength,
+                    energy = v.energy,
+                    loudness = v.loudness,
+                    "dynamicRange" = v.dynamic_range,
+                    danceability = v.danceability,
+                    valence = v.valence,
+                    arousal = v.arousal,
+                    instrumentalness = v.instrumentalness,
+                    acousticness = v.acousticness,
+                    speechiness = v.speechiness,
+                    "moodTags" = v.mood_tags,
+                    "essentiaGenres" = v.essentia_genres,
+                    "moodHappy" = v.mood_happy,
+                    "moodSad" = v.mood_sad,
+                    "moodRelaxed" = v.mood_relaxed,
+                    "moodAggressive" = v.mood_aggressive,
+                    "moodParty" = v.mood_party,
+                    "moodAcoustic" = v.mood_acoustic,
+                    "moodElectronic" = v.mood_electronic,
+                    "danceabilityMl" = v.danceability_ml,
+                    "analysisMode" = v.analysis_mode,
                     "analysisStatus" = 'completed',
                     "analysisStartedAt" = NULL,
-                    "analysisVersion" = %s,
-                    "analyzedAt" = %s,
+                    "analysisVersion" = v.analysis_version,
+                    "analyzedAt" = v.analyzed_at,
                     "analysisError" = NULL,
                     "updatedAt" = NOW()
-                WHERE id = %s
-            """, (
-                features['bpm'],
-                features['beatsCount'],
-                features['key'],
-                features['keyScale'],
-                features['keyStrength'],
-                features['energy'],
-                features['loudness'],
-                features['dynamicRange'],
-                features['danceability'],
-                features['valence'],
-                features['arousal'],
-                features['instrumentalness'],
-                features['acousticness'],
-                features['speechiness'],
-                features['moodTags'],
-                features['essentiaGenres'],
-                features.get('moodHappy'),
-                features.get('moodSad'),
-                features.get('moodRelaxed'),
-                features.get('moodAggressive'),
-                features.get('moodParty'),
-                features.get('moodAcoustic'),
-                features.get('moodElectronic'),
-                features.get('danceabilityMl'),
-                features.get('analysisMode', 'standard'),
-                ESSENTIA_VERSION,
-                datetime.utcnow(),
-                track_id
-            ))
+                FROM (VALUES %s) AS v(
+                    id, bpm, beats_count, key, key_scale, key_strength, energy,
+                    loudness, dynamic_range, danceability, valence, arousal,
+                    instrumentalness, acousticness, speechiness, mood_tags,
+                    essentia_genres, mood_happy, mood_sad, mood_relaxed,
+                    mood_aggressive, mood_party, mood_acoustic, mood_electronic,
+                    danceability_ml, analysis_mode, analyzed_at, analysis_version
+                )
+                WHERE t.id = v.id
+            """, rows, template=TRACK_RESULT_ROW_TEMPLATE, page_size=len(rows))
 
             # Successful analysis should clear stale unresolved audio failures
-            # for this track so UI failure counts remain accurate across reruns.
+            # for these tracks so UI failure counts remain accurate across reruns.
             cursor.execute("""
                 UPDATE "EnrichmentFailure"
                 SET
                     resolved = true,
                     "resolvedAt" = NOW()
                 WHERE "entityType" = 'audio'
-                AND "entityId" = %s
+                AND "entityId" = ANY(%s)
                 AND resolved = false
-            """, (track_id,))
+            """, (track_ids,))
 
             self.db.commit()
         except Exception as e:
-            logger.error(f"Failed to save results for {track_id}: {e}")
+            logger.error(f"Failed to save results for {len(track_ids)} tracks: {e}")
             self.db.rollback()
+            if len(rows) > 1:
+                # Retry row by row so one bad row doesn't drop the whole group
+                saved_ids = set(track_ids)
+                for result in results:
+                    if result[0] in saved_ids:
+                        malformed.extend(self._save_results([result]))
+            else:
+                malformed.append((track_ids[0], f"Failed to save analysis result: {e}", False))
         finally:
             cursor.close()
+        return malformed
     
-    def _save_failed(self, track_id: str, error: str, permanent: bool = False):
-        """Mark track as failed and record in EnrichmentFailure table."""
+    def _save_failed(self, failures: List[Tuple[str, str, bool]]):
+        """Mark a batch of (track_id, error, permanent) tracks failed and record
+        each in the EnrichmentFailure table."""
+        if not failures:
+            return
+
+        # One row per track: ON CONFLICT can't touch the same failure row twice
+        by_track = {track_id: (error, permanent) for track_id, error, permanent in failures}
+        rows = [
+            (track_id, error[:500], permanent, str(uuid.uuid4()))
+            for track_id, (error, permanent) in by_track.items()
+        ]
+
         cursor = self.db.get_cursor()
         try:
-            # Get track details for failure recording
-            cursor.execute("""
-                SELECT
-                    t.title,
-                    t."filePath",
-                    a."artistId" AS "artistId"
-                FROM "Track" t
-                LEFT JOIN "Album" a ON a.id = t."albumId"
-                WHERE t.id = %s
-            """, (track_id,))
-            track = cursor.fetchone()
-            
-            # Update track status
-            if permanent:
-                cursor.execute("""
-                    UPDATE "Track"
-                    SET
-                        "analysisStatus" = 'failed',
-                        "analysisError" = %s,
-                        "analysisRetryCount" = %s,
-                        "analysisStartedAt" = NULL,
-                        "updatedAt" = NOW()
-                    WHERE id = %s
-                    RETURNING "analysisRetryCount"
-                """, (error[:500], MAX_RETRIES, track_id))
-            else:
-                cursor.execute("""
-                    UPDATE "Track"
+            # Mark the tracks failed and record the failures for user visibility
+            # in one round-trip. No EnrichmentFailure row if a track is gone.
+            retry_counts = dict(execute_values(cursor, """
+                WITH v (id, error, permanent, failure_id, max_retries) AS (
+                    VALUES %s
+                ),
+                upd AS (
+                    UPDATE "Track" t
                     SET
                         "analysisStatus" = 'failed',
-                        "analysisError" = %s,
-                        "analysisRetryCount" = COALESCE("analysisRetryCount", 0) + 1,
+                        "analysisError" = v.error,
+                        "analysisRetryCount" = CASE
+                            WHEN v.permanent THEN v.max_retries
+                            ELSE COALESCE(t."analysisRetryCount", 0) + 1
+                        END,
                         "analysisStartedAt" = NULL,
                         "updatedAt" = NOW()
-                    WHERE id = %s
-                    RETURNING "analysisRetryCount"
-                """, (error[:500], track_id))
-            
-            result = cursor.fetchone()
-            retry_count = result['analysisRetryCount'] if result else 0
-            
-            # Record failure in EnrichmentFailure table for user visibility
-            if track:
-                cursor.execute("""
+                    FROM v
+                    WHERE t.id = v.id
+                    RETURNING t.id, t.title, t."filePath", t."albumId", t."analysisRetryCount",
+                        v.error, v.permanent, v.failure_id, v.max_retries
+                ),
+                ins AS (
                     INSERT INTO "EnrichmentFailure" (
                         id, "entityType", "entityId", "entityName", "errorMessage",
                         "lastFailedAt", "retryCount", metadata
-                    ) VALUES (%s, %s, %s, %s, %s, NOW(), 1, %s)
+                    )
+                    SELECT
+                        u.failure_id, 'audio', u.id, u.title, u.error, NOW(), 1,
+                        jsonb_build_object(
+                            'filePath', u."filePath",
+                            'artistId', a."artistId",
+                            'permanent', u.permanent,
+                            'retryCount', u."analysisRetryCount",
+                            'maxRetries', u.max_retries
+                        )
+                    FROM upd u
+                    LEFT JOIN "Album" a ON a.id = u."albumId"
                     ON CONFLICT ("entityType", "entityId")
                     DO UPDATE SET
                         "errorMessage" = EXCLUDED."errorMessage",
@@ -1994,36 +2388,27 @@ class AnalysisWorker:
                         metadata = EXCLUDED.metadata,
                         resolved = false,
                         skipped = false
-                """, (
-                    str(uuid.uuid4()),
-                    'audio',
-                    track_id,
-                    track.get('title', 'Unknown Track'),
-                    error[:500],
-                    Json({
-                        'filePath': track.get('filePath'),
-                        'artistId': track.get('artistId'),
-                        'permanent': permanent,
-                        'retryCount': retry_count,
-                        'maxRetries': MAX_RETRIES
-                    })
-                ))
-            
-            if permanent:
-                logger.warning(f"Track {track_id} permanently failed: {error[:200]}")
-            elif retry_count >= MAX_RETRIES:
-                logger.warning(f"Track {track_id} has permanently failed after {retry_count} attempts")
-            else:
-                logger.info(f"Track {track_id} failed (attempt {retry_count}/{MAX_RETRIES}, will retry)")
+                )
+                SELECT id, "analysisRetryCount" FROM upd
+            """, rows, template=FAILURE_ROW_TEMPLATE, page_size=len(rows), fetch=True))
             
             self.db.commit()
         except Exception as e:
-            logger.error(f"Failed to mark track as failed: {e}")
+            logger.error(f"Failed to mark {len(rows)} tracks as failed: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             self.db.rollback()
+            return
         finally:
             cursor.close()
 
+        for track_id, (error, permanent) in by_track.items():
+            retry_count = retry_counts.get(track_id, 0)
+            if permanent:
+                logger.warning(f"Track {track_id} permanently failed: {error[:200]}")
+            elif retry_count >= MAX_RETRIES:
+                logger.warning(f"Track {track_id} has permanently failed after {retry_count} attempts")
+            else:
+                logger.info(f"Track {track_id} failed (attempt {retry_count}/{MAX_RETRIES}, will retry)")
 
 def main():
     """Main entry point"""
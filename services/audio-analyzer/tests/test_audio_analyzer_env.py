@@ -45,3 +45,20 @@ def test_configure_thread_env_sets_tf_and_blas_vars(
     assert os.environ["TF_CPP_MIN_LOG_LEVEL"] == "2"
     assert os.environ["TF_NUM_INTRAOP_THREADS"] == "3"
     assert os.environ["TF_NUM_INTEROP_THREADS"] == "1"
+
+
+def test_configure_thread_env_caps_threads_to_cpus_per_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for key in THREAD_ENV_KEYS:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+
+    applied = configure_thread_env(threads_per_worker=4, workers=4)
+
+    assert applied == 2
+    for key in THREAD_ENV_KEYS:
+        assert os.environ[key] == "2"
+
+    assert configure_thread_env(threads_per_worker=4, workers=16) == 1
+    assert configure_thread_env(threads_per_worker=4) == 4
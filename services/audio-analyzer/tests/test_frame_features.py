@@ -0,0 +1,79 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.common.frame_features import frame_rms, frame_zero_crossing_rate
+
+
+FRAME_SIZE = 2048
+HOP_SIZE = 1024
+
+
+def _reference_zcr(frame) -> float:
+    """Per-frame loop of Essentia's ZeroCrossingRate with threshold 0."""
+    was_positive = frame[0] > 0.0
+    crossings = 0
+    for value in frame[1:]:
+        is_positive = value > 0.0
+        if is_positive != was_positive:
+            crossings += 1
+            was_positive = is_positive
+    return crossings / len(frame)
+
+
+def _reference_rms(frame) -> float:
+    return math.sqrt(sum(float(value) * float(value) for value in frame) / len(frame))
+
+
+def _synthetic_signal():
+    rng = np.random.default_rng(1234)
+    t = np.arange(44100, dtype=np.float32) / 44100
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    noise = rng.normal(0, 0.01, 8192).astype(np.float32)
+    silence = np.zeros(6144, dtype=np.float32)
+    negative_zero = np.full(4096, -0.0, dtype=np.float32)
+    # Quiet ticks on a silent bed: zeros alternate with tiny +/- samples
+    ticks = np.zeros(4096, dtype=np.float32)
+    ticks[::3] = 1e-4
+    ticks[1::7] = -1e-4
+    return np.concatenate([tone, silence, noise, negative_zero, ticks, silence])
+
+
+def _frames(signal):
+    n_frames = (len(signal) - FRAME_SIZE) // HOP_SIZE
+    return sliding_window_view(signal, FRAME_SIZE)[::HOP_SIZE][:n_frames]
+
+
+def test_frame_zero_crossing_rate_matches_per_frame_reference() -> None:
+    frames = _frames(_synthetic_signal())
+
+    vectorized = frame_zero_crossing_rate(frames)
+    reference = np.array([_reference_zcr(frame) for frame in frames])
+
+    np.testing.assert_allclose(vectorized, reference, rtol=0, atol=1e-12)
+
+
+def test_frame_zero_crossing_rate_treats_zero_and_negative_zero_as_non_positive() -> None:
+    frames = np.array(
+        [
+            [0.0, -0.0, 0.0, -0.0],
+            [0.0, 1.0, -0.0, 1.0],
+            [-1.0, -0.0, -1.0, 0.0],
+        ],
+        dtype=np.float32,
+    )
+
+    assert frame_zero_crossing_rate(frames).tolist() == [0.0, 0.75, 0.0]
+
+
+def test_frame_rms_matches_per_frame_reference() -> None:
+    frames = _frames(_synthetic_signal())
+
+    vectorized = frame_rms(frames)
+    reference = np.array([_reference_rms(frame) for frame in frames])
+
+    np.testing.assert_allclose(vectorized, reference, rtol=1e-5, atol=1e-7)
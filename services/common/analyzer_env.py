@@ -1,7 +1,9 @@
 """Shared environment parsing and thread-env configuration for analyzers."""
 
 import os
-from typing import Union
+from typing import Optional, Union
+
+_TRUTHY_VALUES = {"1", "true", "yes", "on"}
 
 
 def get_int_env(name: str, default: Union[int, str]) -> int:
@@ -9,12 +11,29 @@ def get_int_env(name: str, default: Union[int, str]) -> int:
     return int(os.getenv(name, str(default)))
 
 
+def get_bool_env(name: str, default: bool = False) -> bool:
+    """Read a boolean env var; 1/true/yes/on (case-insensitive) are truthy."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in _TRUTHY_VALUES
+
+
 def configure_thread_env(
     threads_per_worker: int,
     *,
     configure_tensorflow: bool = False,
-) -> None:
-    """Apply consistent thread-limit environment variables for analyzer services."""
+    workers: Optional[int] = None,
+) -> int:
+    """Apply consistent thread-limit environment variables for analyzer services.
+
+    When ``workers`` (separate worker processes) is given, the per-worker count
+    is capped so workers x threads doesn't exceed the CPU count. Returns the
+    thread count that was applied.
+    """
+    if workers:
+        cpu_count = os.cpu_count() or 1
+        threads_per_worker = max(1, min(threads_per_worker, cpu_count // max(1, workers)))
     thread_count = str(threads_per_worker)
 
     if configure_tensorflow:
@@ -27,3 +46,4 @@ def configure_thread_env(
     os.environ["OPENBLAS_NUM_THREADS"] = thread_count
     os.environ["MKL_NUM_THREADS"] = thread_count
     os.environ["NUMEXPR_MAX_THREADS"] = thread_count
+    return threads_per_worker
@@ -0,0 +1,23 @@
+"""Vectorized per-frame time-domain features for the audio analyzer.
+
+Each helper takes a ``(n_frames, frame_size)`` array and matches the
+per-frame Essentia algorithm it replaced.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def frame_rms(frames: np.ndarray) -> np.ndarray:
+    """Root mean square of each frame (Essentia ``RMS``)."""
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1])
+
+
+def frame_zero_crossing_rate(frames: np.ndarray) -> np.ndarray:
+    """Zero-crossing rate of each frame (Essentia ``ZeroCrossingRate``, threshold 0).
+
+    A sample is positive only when it is ``> 0``, so exact zeros and ``-0.0``
+    (digital silence, padding) sit on the non-positive side as in Essentia.
+    """
+    return np.count_nonzero(np.diff(frames > 0, axis=1), axis=1) / frames.shape[1]